@@ -1,16 +1,28 @@
+import contextlib
+import functools
+import math
+import mmap
 import os
-import json
-import random
+import queue
+import threading
 
-# --- Ordner für Dataset ---
+import numpy as np
+import orjson
+
+# --- Ordner für Dataset (wird einmalig in main() angelegt) ---
 output_dir = "dataset_juce8_complete_full"
-os.makedirs(output_dir, exist_ok=True)
-train_file = os.path.join(output_dir, "train.jsonl")
 val_file = os.path.join(output_dir, "val.jsonl")
 
 # --- Parameter ---
 TOTAL_EXAMPLES = 10000
 VAL_RATIO = 0.15
+TRAIN_SHARDS = 4                     # train-000.jsonl ... (parallel geschrieben); 1 = eine train.jsonl
+SPLIT_SEED = 42                      # Seed für den stratifizierten Train/Val-Split
+DATASET_SEED = None                  # Seed für Kategorie-/Beispielwahl (None = OS-Entropie, int = reproduzierbar)
+WRITE_BUFFER_SIZE = 4 * 1024 * 1024  # mmap-Fenster der JSONL-Writer (Vielfaches der mmap-Granularität)
+WRITE_BATCH_SIZE = 64                # Beispiele pro Batch an einen Schreib-Thread
+WRITE_QUEUE_SIZE = 4                 # Max. Batches zwischen Generator und Schreib-Thread
+ZSTD_LEVEL = 0                       # >0: Ausgabe zstd-komprimiert als *.jsonl.zst (benötigt zstandard)
 
 # ==================== JUCE 8 CROSS-PLATFORM WEBVIEW (VOLLSTÄNDIG) ====================
 
@@ -22,6 +34,16 @@ JUCE8_CORE_EXAMPLES = [
 #include <juce_core/juce_core.h>
 #include <juce_gui_basics/juce_gui_basics.h>
 #include <juce_events/juce_events.h>
+#include <charconv>
+
+// Apple's libc++ only ships floating-point std::to_chars from macOS 13.3 / iOS 16.3
+#if defined(__ENVIRONMENT_MAC_OS_X_VERSION_MIN_REQUIRED__) && __ENVIRONMENT_MAC_OS_X_VERSION_MIN_REQUIRED__ < 130300
+    #define HAS_FLOAT_TO_CHARS 0
+#elif defined(__ENVIRONMENT_IPHONE_OS_VERSION_MIN_REQUIRED__) && __ENVIRONMENT_IPHONE_OS_VERSION_MIN_REQUIRED__ < 160300
+    #define HAS_FLOAT_TO_CHARS 0
+#else
+    #define HAS_FLOAT_TO_CHARS 1
+#endif
 
 // Platform detection macros
 #if JUCE_WINDOWS
@@ -71,6 +93,18 @@ public:
         // Set initial size
         setSize(1000, 700);
         
+        // The parameter list is fixed for the processor's lifetime - downcast
+        // once here instead of a dynamic_cast per parameter on every timer tick
+        for (auto* param : processor.getParameters()) {
+            if (auto* p = dynamic_cast<juce::AudioProcessorParameterWithID*>(param)) {
+                paramsWithID.push_back(p);
+                
+                // IDs never change: escape each one once as a ready "id": key
+                paramKeysJson.push_back((juce::JSON::toString(juce::var(p->paramID)) + ":").toStdString());
+            }
+        }
+        lastSentValues.assign(paramsWithID.size(), 0.0f);
+        
         // Load platform settings
         loadPlatformSettings();
     }
@@ -122,16 +156,19 @@ public:
     void pageFinishedLoading(const juce::String& url) override {
         DBG("Page loaded: " + url);
         
-        // Send initial state to frontend
-        sendParameterUpdatesToFrontend();
+        // Send full initial state to frontend (a reloaded page has no previous values)
+        sendParameterUpdatesToFrontend(true);
         
         // Notify frontend that plugin is ready
-        webView.executeJavaScript(
-            "if (window.juce_onPluginReady) { window.juce_onPluginReady(); }"
-        );
+        queueFrontendMessage(kPluginReadyMessage);
         
         // Send platform info
         sendPlatformInfoToFrontend();
+        
+#if JUCE_MAC
+        // The hotplug callback only fires on changes - send the current list once
+        sendMidiDeviceListToFrontend();
+#endif
     }
     
     void windowCloseRequest() override {
@@ -160,6 +197,9 @@ private:
         options.enableJavaScript = true;
         options.enableNativeIntegration = true;
         
+        // Frontend dispatcher for the batched native-integration events
+        options = options.withUserScript(kFrontendBootstrap);
+        
         // Cross-platform security settings
         options.allowedOrigins = {
             "http://localhost:*",
@@ -364,6 +404,14 @@ private:
         // Request permissions (sandbox compatible)
         requestMacOSPermissions();
         
+#if JUCE_MAC
+        // MIDI device changes are pushed by CoreMIDI instead of polling
+        // MidiInput::getDevices() and comparing the lists on every timer tick
+        midiDeviceListConnection = juce::MidiDeviceListConnection::make([this] {
+            sendMidiDeviceListToFrontend();
+        });
+#endif
+        
         // macOS specific: Set up audio session
         juce::AudioDeviceManager::AudioDeviceSetup setup;
         setup.sampleRate = 48000;
@@ -468,7 +516,7 @@ private:
         
         // Send platform info to GUI
         webView.executeJavaScript(
-            "window.__PLATFORM_INFO__ = " + juce::JSON::toString(getPlatformInfoJSON()) + ";"
+            "window.__PLATFORM_INFO__ = " + getPlatformInfoJSONString() + ";"
         );
     }
     
@@ -835,43 +883,161 @@ private:
     }
     
     void timerCallback() override {
-        // Platform-agnostic periodic updates
+        // Platform-agnostic periodic updates, run in levels so that native
+        // reads, payload building and the WebView write never interleave:
+        
+        // 1. Native reads - platform and device state
+        handlePlatformSpecificTasks();
+        
+        // 2. Payloads - parameter/visualisation snapshots (the JSON encoding
+        //    itself runs on encodingPool)
         sendParameterUpdatesToFrontend();
         updateVisualizations();
-        handlePlatformSpecificTasks();
+        
+        // 3. Write - everything queued since the last tick crosses the WebView
+        //    bridge at once
+        flushFrontendMessages();
+    }
+    
+    // All frontend messages are collected here as ["handler", payload] JSON and
+    // posted as one native-integration event per timer tick: one bridge
+    // crossing per tick and no JS source for the page to compile and run, as
+    // executeJavaScript needs (message thread only)
+    void queueFrontendMessage(const juce::String& messageJson) {
+        pendingMessages.add(messageJson);
     }
     
-    void sendParameterUpdatesToFrontend() {
-        // Collect all parameter values
-        juce::DynamicObject::Ptr paramsObj = new juce::DynamicObject();
+    void flushFrontendMessages() {
+        // emitEventIfBrowserIsVisible drops events while the editor is hidden:
+        // keep the batch until it can actually be delivered
+        if (pendingMessages.isEmpty() || !isShowing()) {
+            return;
+        }
         
-        for (auto* param : processor.getParameters()) {
-            if (auto* p = dynamic_cast<juce::AudioProcessorParameterWithID*>(param)) {
-                paramsObj->setProperty(p->paramID, p->getValue());
+        // The batch is already serialised - it travels as one JSON string that
+        // the bootstrap script parses, no var tree is built for it
+        webView.emitEventIfBrowserIsVisible("juce_frontendBatch",
+                                            "[" + pendingMessages.joinIntoString(",") + "]");
+        pendingMessages.clearQuick();
+    }
+    
+    // Message heads per frontend handler (payload and "]" follow) - built once
+    inline static const juce::String kParamsMessage = R"(["juce_onParametersUpdate",)";
+    inline static const juce::String kPlatformInfoMessage = R"(["juce_onPlatformInfo",)";
+    inline static const juce::String kMidiDevicesMessage = R"(["juce_onMidiDevicesUpdate",)";
+    inline static const juce::String kPluginReadyMessage = R"(["juce_onPluginReady",null])";
+    
+    // Injected once at document start: hands every batched message to the
+    // page's window.juce_on* handler
+    inline static const juce::String kFrontendBootstrap = R"js(
+        window.__JUCE__.backend.addEventListener("juce_frontendBatch", (batch) => {
+            for (const [handler, payload] of JSON.parse(batch)) {
+                if (window[handler]) {
+                    window[handler](payload);
+                }
             }
+        });
+    )js";
+    
+    void sendParameterUpdatesToFrontend(bool sendAll = false) {
+        // Collect only parameters that changed since the last push (delta update),
+        // so an idle plugin causes no JSON encoding and no WebView round-trip.
+        // Only a snapshot of the changed values is taken on the message thread.
+        std::vector<std::pair<size_t, float>> changes;
+        
+        // While hidden nothing is delivered - leave lastSentValues alone so the
+        // changes go out as deltas once the editor is visible again, instead of
+        // piling up one queued message per tick
+        if (!sendAll && !isShowing()) {
+            return;
         }
         
-        // Send to frontend
-        juce::String js = R"js(
-            if (window.juce_onParametersUpdate) {
-                juce_onParametersUpdate({{PARAMS}});
+        for (size_t i = 0; i < paramsWithID.size(); ++i) {
+            const float value = paramsWithID[i]->getValue();
+            if (sendAll || std::abs(value - lastSentValues[i]) > parameterEpsilon) {
+                lastSentValues[i] = value;
+                changes.emplace_back(i, value);
             }
-        )js";
+        }
+        
+        if (changes.empty()) {
+            return;
+        }
         
-        js = js.replace("{{PARAMS}}", juce::JSON::toString(juce::var(paramsObj.get())));
-        webView.executeJavaScript(js);
+        // JSON encoding runs on the worker; all changes of this tick go to the
+        // frontend in one call
+        encodingPool.addJob([this, changes = std::move(changes), safeThis = SafePointer(this)] {
+            postToFrontend(safeThis, buildParamsMessage(changes));
+        });
     }
     
-    void sendPlatformInfoToFrontend() {
-        // Send platform information
-        juce::String js = R"js(
-            if (window.juce_onPlatformInfo) {
-                juce_onPlatformInfo({{PLATFORM_INFO}});
+    // Writes the message with its {"id":value,...} payload straight into a reused
+    // buffer - no DynamicObject, no boxed vars, no second walk in JSON::toString,
+    // and the keys are copied from the pre-escaped paramKeysJson.
+    // Only runs on the encodingPool thread, which owns paramsStream.
+    juce::String buildParamsMessage(const std::vector<std::pair<size_t, float>>& changes) {
+        paramsStream.reset();
+        paramsStream << kParamsMessage << '{';
+        
+        bool first = true;
+        for (const auto& [index, value] : changes) {
+            if (!first) {
+                paramsStream << ',';
+            }
+            first = false;
+            const auto& key = paramKeysJson[index];
+            paramsStream.write(key.data(), key.size());
+            
+#if HAS_FLOAT_TO_CHARS
+            // Shortest round-trip digits via std::to_chars - no String, no
+            // printf-style formatting, no locale
+            char number[32];
+            const auto result = std::to_chars(number, number + sizeof(number), value);
+            paramsStream.write(number, static_cast<size_t>(result.ptr - number));
+#else
+            // Older Apple deployment targets: juce::String formats without the
+            // C locale, so the decimal point stays a '.' as JSON requires
+            paramsStream << juce::String(value, 9);
+#endif
+        }
+        
+        paramsStream << '}' << ']';
+        return paramsStream.toUTF8();
+    }
+    
+    using SafePointer = juce::Component::SafePointer<CrossPlatformWebViewEditor>;
+    
+    // Hands a finished message back to the message thread - the WebView must
+    // only be touched there, and the editor may be gone by then
+    static void postToFrontend(SafePointer editor, juce::String messageJson) {
+        juce::MessageManager::callAsync([editor, messageJson = std::move(messageJson)] {
+            if (editor != nullptr) {
+                editor->queueFrontendMessage(messageJson);
             }
-        )js";
+        });
+    }
+    
+    void sendPlatformInfoToFrontend() {
+        // Send platform information (stays on the message thread - it queries
+        // the processor and the Desktop, which are not thread-safe)
+        queueFrontendMessage(kPlatformInfoMessage + getPlatformInfoJSONString() + "]");
+    }
+    
+    // Platform info is static for the plugin's lifetime except for the audio
+    // settings it reports - serialise it once and again only when those change
+    const juce::String& getPlatformInfoJSONString() {
+        const double sampleRate = processor.getSampleRate();
+        const int blockSize = processor.getBlockSize();
+        
+        if (cachedPlatformInfoJSON.isEmpty()
+            || sampleRate != cachedPlatformInfoSampleRate
+            || blockSize != cachedPlatformInfoBlockSize) {
+            cachedPlatformInfoJSON = juce::JSON::toString(getPlatformInfoJSON());
+            cachedPlatformInfoSampleRate = sampleRate;
+            cachedPlatformInfoBlockSize = blockSize;
+        }
         
-        js = js.replace("{{PLATFORM_INFO}}", juce::JSON::toString(getPlatformInfoJSON()));
-        webView.executeJavaScript(js);
+        return cachedPlatformInfoJSON;
     }
     
     void updateVisualizations() {
@@ -888,17 +1054,14 @@ private:
         auto now = juce::Time::currentTimeMillis();
         if (now - lastUpdateCheck > 300000) { // Every 5 minutes
             lastUpdateCheck = now;
-            checkForWebView2Updates();
+            
+            // The check may hit the registry and disk - only the timestamp
+            // compare stays on the message thread
+            backgroundPool.addJob([] { checkForWebView2Updates(); });
         }
         
 #elif JUCE_MAC
-        // macOS: Monitor audio/MIDI device changes
-        static juce::Array<juce::String> lastMidiInputs;
-        juce::Array<juce::String> currentMidiInputs = juce::MidiInput::getDevices();
-        if (currentMidiInputs != lastMidiInputs) {
-            lastMidiInputs = currentMidiInputs;
-            sendMidiDeviceListToFrontend();
-        }
+        // macOS: MIDI device changes arrive via midiDeviceListConnection
         
 #elif JUCE_LINUX
         // Linux: Check for D-Bus messages
@@ -907,8 +1070,9 @@ private:
     }
     
 #if JUCE_WINDOWS
-    void checkForWebView2Updates() {
-        // Windows: Check if WebView2 needs updating
+    static void checkForWebView2Updates() {
+        // Windows: Check if WebView2 needs updating (runs on backgroundPool;
+        // post UI changes back with MessageManager::callAsync)
         juce::Logger::writeToLog("Checking for WebView2 updates...");
         // Implementation would use WebView2 loader API
     }
@@ -916,15 +1080,12 @@ private:
     
 #if JUCE_MAC
     void sendMidiDeviceListToFrontend() {
-        juce::String js = R"js(
-            if (window.juce_onMidiDevicesUpdate) {
-                juce_onMidiDevicesUpdate({{DEVICES}});
-            }
-        )js";
-        
-        juce::var devicesVar(juce::MidiInput::getDevices());
-        js = js.replace("{{DEVICES}}", juce::JSON::toString(devicesVar));
-        webView.executeJavaScript(js);
+        auto devices = juce::MidiInput::getDevices();
+        encodingPool.addJob([devices, safeThis = SafePointer(this)] {
+            postToFrontend(safeThis, kMidiDevicesMessage
+                                     + juce::JSON::toString(juce::var(devices))
+                                     + "]");
+        });
     }
 #endif
     
@@ -940,6 +1101,42 @@ private:
     juce::WebViewComponent webView;
     PlatformSettings platformSettings;
     
+    // Parameters with IDs, and the last normalised values pushed to the
+    // frontend for each of them (message thread only)
+    std::vector<juce::AudioProcessorParameterWithID*> paramsWithID;
+    std::vector<float> lastSentValues;
+    
+    // JSON-escaped "id": key per entry of paramsWithID (immutable after the
+    // constructor, so the encoding worker may read it)
+    std::vector<std::string> paramKeysJson;
+    static constexpr float parameterEpsilon = 1.0e-6f;
+    
+#if JUCE_MAC
+    juce::MidiDeviceListConnection midiDeviceListConnection;
+#endif
+    
+    // Serialised platform info and the audio settings it was built with
+    juce::String cachedPlatformInfoJSON;
+    double cachedPlatformInfoSampleRate = 0.0;
+    int cachedPlatformInfoBlockSize = 0;
+    
+    // Frontend messages waiting for the next timer tick
+    juce::StringArray pendingMessages;
+    
+    // Reused JSON buffer for parameter pushes (encodingPool thread only)
+    juce::MemoryOutputStream paramsStream { 1024 };
+    
+    // Worker for JSON encoding of frontend messages. The thread pools are
+    // declared last so they are destroyed - and their jobs finished - before
+    // the other members.
+    juce::ThreadPool encodingPool { 1 };
+    
+#if JUCE_WINDOWS
+    // Worker for slow platform checks, kept apart so they never delay the
+    // frontend messages queued on encodingPool
+    juce::ThreadPool backgroundPool { 1 };
+#endif
+    
     JUCE_DECLARE_NON_COPYABLE_WITH_LEAK_DETECTOR(CrossPlatformWebViewEditor)
 };"""
     },
@@ -957,9 +1154,10 @@ public:
         initializeDSPModules();
         
         // Add parameter listeners
-        parameters.addParameterListener("cutoff", this);
-        parameters.addParameterListener("resonance", this);
-        parameters.addParameterListener("gain", this);
+        for (auto* id : { "cutoff", "resonance", "filter_type", "delay_time", "delay_feedback",
+                          "reverb_size", "reverb_damping", "gain", "lfo_rate" }) {
+            parameters.addParameterListener(id, this);
+        }
         
         // Initialize synthesiser
         initializeSynthesizer();
@@ -1116,38 +1314,57 @@ public:
     void processBlock(juce::AudioBuffer<float>& buffer, juce::MidiBuffer& midiMessages) override {
         juce::ScopedNoDenormals noDenormals;
         
+        // Apply parameter changes flagged since the last block
+        applyPendingParameterChanges();
+        
         // Clear buffer if needed
         buffer.clear();
         
         // Process MIDI messages
         synth.renderNextBlock(buffer, midiMessages, 0, buffer.getNumSamples());
         
-        // Apply filter
+        // Apply filter with LFO-modulated cutoff at control rate: the block is
+        // filtered in sub-blocks of lfoControlInterval samples with one cutoff
+        // update each, and the LFO advances by the samples actually processed
+        // (independent of the host block size)
         juce::dsp::AudioBlock<float> block(buffer);
         juce::dsp::ProcessContextReplacing<float> context(block);
-        filter.process(context);
         
-        // Apply LFO modulation to filter cutoff
-        float lfoValue = lfo.getNextSample() * 
-                        parameters.getRawParameterValue("lfo_amount")->load() * 1000.0f;
-        if (lfoValue != 0.0f) {
-            auto cutoff = parameters.getRawParameterValue("cutoff")->load();
-            auto modulatedCutoff = juce::jlimit(20.0f, 20000.0f, cutoff + lfoValue);
-            setFilterCutoff(modulatedCutoff);
+        const float lfoDepth = lfoAmountParam->load(std::memory_order_relaxed) * 1000.0f;
+        const float baseCutoff = cutoffParam->load(std::memory_order_relaxed);
+        const int numSamples = buffer.getNumSamples();
+        
+        for (int pos = 0; pos < numSamples; pos += lfoControlInterval) {
+            const int n = juce::jmin(lfoControlInterval, numSamples - pos);
+            
+            if (lfoDepth > 1.0e-3f) {
+                setFilterCutoff(juce::jlimit(20.0f, 20000.0f, baseCutoff + lfo.getNextSample() * lfoDepth));
+                lfo.skip(n - 1);
+            }
+            
+            auto subBlock = block.getSubBlock((size_t) pos, (size_t) n);
+            juce::dsp::ProcessContextReplacing<float> subContext(subBlock);
+            filter.process(subContext);
         }
         
-        // Apply delay effect
-        if (parameters.getRawParameterValue("delay_time")->load() > 0.01f) {
-            juce::dsp::AudioBlock<float> delayBlock(buffer);
-            juce::dsp::ProcessContextReplacing<float> delayContext(delayBlock);
-            delay.process(delayContext);
+        // Delay and reverb are skipped entirely once the input has been silent
+        // for longer than their tails (getMagnitude is a vectorised min/max scan)
+        if (buffer.getMagnitude(0, numSamples) >= silenceThreshold) {
+            effectsTailRemaining = effectsTailSamples;
+        } else {
+            effectsTailRemaining = juce::jmax(0, effectsTailRemaining - numSamples);
         }
         
-        // Apply reverb effect
-        if (parameters.getRawParameterValue("reverb_size")->load() > 0.01f) {
-            juce::dsp::AudioBlock<float> reverbBlock(buffer);
-            juce::dsp::ProcessContextReplacing<float> reverbContext(reverbBlock);
-            reverb.process(reverbContext);
+        if (effectsTailRemaining > 0) {
+            // Apply delay effect
+            if (delayTimeParam->load(std::memory_order_relaxed) > 0.01f) {
+                delay.process(context);
+            }
+            
+            // Apply reverb effect
+            if (reverbSizeParam->load(std::memory_order_relaxed) > 0.01f) {
+                reverb.process(context);
+            }
         }
         
         // Apply gain
@@ -1163,22 +1380,50 @@ public:
         synth.clearVoices();
     }
     
-    void parameterChanged(const juce::String& parameterID, float newValue) override {
-        // Handle parameter changes
+    void parameterChanged(const juce::String& parameterID, float) override {
+        // Can be called on the audio thread (automation) or any other thread:
+        // only flag the affected DSP group lock-free here. processBlock applies
+        // it before the next block, so the DSP modules are only ever touched by
+        // the audio thread - no locks, no allocation, no callAsync.
         if (parameterID == "cutoff" || parameterID == "resonance" || parameterID == "filter_type") {
-            updateFilter();
+            markDirty(FilterDirty);
         } else if (parameterID == "delay_time" || parameterID == "delay_feedback") {
-            updateDelay();
+            markDirty(DelayDirty);
         } else if (parameterID == "reverb_size" || parameterID == "reverb_damping") {
-            updateReverb();
+            markDirty(ReverbDirty);
         } else if (parameterID == "gain") {
-            updateGain();
+            markDirty(GainDirty);
         } else if (parameterID == "lfo_rate") {
-            lfo.setFrequency(newValue);
+            markDirty(LfoDirty);
         }
     }
     
 private:
+    enum DirtyGroup : juce::uint32 {
+        FilterDirty = 1 << 0,
+        DelayDirty  = 1 << 1,
+        ReverbDirty = 1 << 2,
+        GainDirty   = 1 << 3,
+        LfoDirty    = 1 << 4
+    };
+    
+    void markDirty(DirtyGroup group) {
+        dirtyGroups.fetch_or(group, std::memory_order_release);
+    }
+    
+    void applyPendingParameterChanges() {
+        // Each dirty group is updated once per block, however many of its
+        // parameters changed in between
+        const auto dirty = dirtyGroups.exchange(0, std::memory_order_acquire);
+        if (dirty == 0) return;
+        
+        if (dirty & FilterDirty) updateFilter();
+        if (dirty & DelayDirty)  updateDelay();
+        if (dirty & ReverbDirty) updateReverb();
+        if (dirty & GainDirty)   updateGain();
+        if (dirty & LfoDirty)    lfo.setFrequency(lfoRateParam->load(std::memory_order_relaxed));
+    }
+    
     void initializeDSPModules() {
         // Initialize filter as lowpass
         filter.setType(juce::dsp::StateVariableTPTFilterType::lowpass);
@@ -1190,11 +1435,11 @@ private:
         reverb.setParameters(juce::dsp::Reverb::Parameters());
         
         // Initialize LFO
-        lfo.setFrequency(parameters.getRawParameterValue("lfo_rate")->load());
+        lfo.setFrequency(lfoRateParam->load(std::memory_order_relaxed));
         lfo.setWaveform(LFO::Waveform::Sine);
         
         // Initialize gain
-        gain.setGainDecibels(parameters.getRawParameterValue("gain")->load());
+        gain.setGainDecibels(gainParam->load(std::memory_order_relaxed));
     }
     
     void initializeSynthesizer() {
@@ -1208,9 +1453,9 @@ private:
     }
     
     void updateFilter() {
-        auto cutoff = parameters.getRawParameterValue("cutoff")->load();
-        auto resonance = parameters.getRawParameterValue("resonance")->load();
-        auto filterType = static_cast<int>(parameters.getRawParameterValue("filter_type")->load());
+        auto cutoff = cutoffParam->load(std::memory_order_relaxed);
+        auto resonance = resonanceParam->load(std::memory_order_relaxed);
+        auto filterType = static_cast<int>(filterTypeParam->load(std::memory_order_relaxed));
         
         // Convert to JUCE DSP filter type
         juce::dsp::StateVariableTPTFilterType type;
@@ -1232,16 +1477,21 @@ private:
     }
     
     void updateDelay() {
-        auto time = parameters.getRawParameterValue("delay_time")->load();
-        auto feedback = parameters.getRawParameterValue("delay_feedback")->load();
+        auto time = delayTimeParam->load(std::memory_order_relaxed);
+        auto feedback = delayFeedbackParam->load(std::memory_order_relaxed);
         
         delay.setDelay(static_cast<float>(time * currentSampleRate));
         delay.setFeedback(feedback);
+        
+        // Conservative tail: delay repeats until the feedback has decayed by
+        // 60 dB, plus the longest reverb decay
+        const double repeats = std::ceil(std::log(0.001) / std::log(juce::jlimit(0.001f, 0.95f, feedback)));
+        effectsTailSamples = static_cast<int>((time * repeats + reverbTailSeconds) * currentSampleRate);
     }
     
     void updateReverb() {
-        auto size = parameters.getRawParameterValue("reverb_size")->load();
-        auto damping = parameters.getRawParameterValue("reverb_damping")->load();
+        auto size = reverbSizeParam->load(std::memory_order_relaxed);
+        auto damping = reverbDampingParam->load(std::memory_order_relaxed);
         
         juce::dsp::Reverb::Parameters params;
         params.roomSize = size;
@@ -1255,7 +1505,7 @@ private:
     }
     
     void updateGain() {
-        auto gainDb = parameters.getRawParameterValue("gain")->load();
+        auto gainDb = gainParam->load(std::memory_order_relaxed);
         gain.setGainDecibels(gainDb);
     }
     
@@ -1282,32 +1532,18 @@ private:
         }
         
         void setWaveform(Waveform wf) {
-            waveform = wf;
+            // Resolve the waveform once here instead of a switch per sample
+            switch(wf) {
+                case Waveform::Sine:     waveFn = [](float p, LFO&) { return sine(p); };     break;
+                case Waveform::Triangle: waveFn = [](float p, LFO&) { return triangle(p); }; break;
+                case Waveform::Saw:      waveFn = [](float p, LFO&) { return saw(p); };      break;
+                case Waveform::Square:   waveFn = [](float p, LFO&) { return square(p); };   break;
+                case Waveform::Random:   waveFn = &sampleAndHold;                            break;
+            }
         }
         
         float getNextSample() {
-            float value = 0.0f;
-            
-            switch(waveform) {
-                case Waveform::Sine:
-                    value = std::sin(phase * 2.0f * 3.1415926535f);
-                    break;
-                case Waveform::Triangle:
-                    value = 2.0f * std::abs(2.0f * phase - 1.0f) - 1.0f;
-                    break;
-                case Waveform::Saw:
-                    value = 2.0f * phase - 1.0f;
-                    break;
-                case Waveform::Square:
-                    value = (phase < 0.5f) ? 1.0f : -1.0f;
-                    break;
-                case Waveform::Random:
-                    if (phase < lastPhase) {
-                        randomValue = random.nextFloat() * 2.0f - 1.0f;
-                    }
-                    value = randomValue;
-                    break;
-            }
+            const float value = waveFn(phase, *this);
             
             lastPhase = phase;
             phase += phaseIncrement;
@@ -1316,7 +1552,39 @@ private:
             return value;
         }
         
+        // Advances the phase as if numSamples samples had been generated
+        void skip(int numSamples) {
+            phase += static_cast<float>(numSamples) * phaseIncrement;
+            phase -= std::floor(phase);
+        }
+        
     private:
+        // Waveform shapes over the phase p in [0, 1)
+        
+        // sin(2 * pi * p) from a lookup table with linear interpolation - the
+        // mechanism juce::dsp::Oscillator uses: one load and one lerp per sample
+        static float sine(float p) {
+            return sineTable.processSampleUnchecked(p);
+        }
+        
+        // Built at static initialisation, never on the audio thread; 2048 points
+        // keep the interpolation error far below audibility for an LFO
+        inline static const juce::dsp::LookupTableTransform<float> sineTable {
+            [](float p) { return std::sin(juce::MathConstants<float>::twoPi * p); }, 0.0f, 1.0f, 2048
+        };
+        
+        static float triangle(float p) { return 2.0f * std::abs(2.0f * p - 1.0f) - 1.0f; }
+        static float saw(float p)      { return 2.0f * p - 1.0f; }
+        static float square(float p)   { return (p < 0.5f) ? 1.0f : -1.0f; }
+        
+        // New random value on every phase wrap
+        static float sampleAndHold(float p, LFO& lfo) {
+            if (p < lfo.lastPhase) {
+                lfo.randomValue = lfo.random.nextFloat() * 2.0f - 1.0f;
+            }
+            return lfo.randomValue;
+        }
+        
         void updatePhaseIncrement() {
             phaseIncrement = frequency / sampleRate;
         }
@@ -1326,7 +1594,10 @@ private:
         float phaseIncrement = 0.0f;
         float frequency = 1.0f;
         double sampleRate = 44100.0;
-        Waveform waveform = Waveform::Sine;
+        
+        using WaveFn = float (*)(float phase, LFO& lfo);
+        WaveFn waveFn = [](float p, LFO&) { return sine(p); };
+        
         juce::Random random;
         float randomValue = 0.0f;
     };
@@ -1346,8 +1617,14 @@ private:
                        juce::SynthesiserSound*, int currentPitchWheelPosition) override {
             frequency = juce::MidiMessage::getMidiNoteInHertz(midiNoteNumber);
             level = velocity * 0.15f;
-            currentAngle = 0.0f;
-            angleDelta = (frequency * 2.0f * juce::MathConstants<float>::pi) / getSampleRate();
+            
+            // Sine via the two-term recurrence s[n+1] = 2cos(delta) * s[n] - s[n-1]:
+            // two multiplies and a subtract per sample instead of a std::sin call
+            // (double state keeps the amplitude stable over long notes)
+            const double angleDelta = frequency * juce::MathConstants<double>::twoPi / getSampleRate();
+            sineCoeff = 2.0 * std::cos(angleDelta);
+            sineCurrent = 0.0;
+            sinePrevious = -std::sin(angleDelta);
             adsr.noteOn();
         }
         
@@ -1364,17 +1641,28 @@ private:
                              int startSample, int numSamples) override {
             if (!isVoiceActive()) return;
             
-            adsr.setSampleRate(getSampleRate());
-            
-            while (--numSamples >= 0) {
-                auto currentSample = std::sin(currentAngle) * level * adsr.getNextSample();
+            // Render the voice once into a scratch block, apply the envelope to the
+            // whole block and mix it into each channel with the vectorised addFrom
+            // (FloatVectorOperations) - no per-sample addSample() per channel
+            while (numSamples > 0) {
+                const int n = juce::jmin(numSamples, voiceBuffer.getNumSamples());
+                auto* voice = voiceBuffer.getWritePointer(0);
+                
+                for (int i = 0; i < n; ++i) {
+                    voice[i] = static_cast<float>(sineCurrent) * level;
+                    const double next = sineCoeff * sineCurrent - sinePrevious;
+                    sinePrevious = sineCurrent;
+                    sineCurrent = next;
+                }
+                
+                adsr.applyEnvelopeToBuffer(voiceBuffer, 0, n);
                 
                 for (int channel = 0; channel < outputBuffer.getNumChannels(); ++channel) {
-                    outputBuffer.addSample(channel, startSample, currentSample);
+                    outputBuffer.addFrom(channel, startSample, voiceBuffer, 0, 0, n);
                 }
                 
-                currentAngle += angleDelta;
-                ++startSample;
+                startSample += n;
+                numSamples -= n;
             }
             
             if (!adsr.isActive()) {
@@ -1385,14 +1673,17 @@ private:
         void prepareToPlay(double sampleRate, int samplesPerBlock) {
             adsr.setSampleRate(sampleRate);
             adsr.setParameters(juce::ADSR::Parameters(0.1f, 0.1f, 0.8f, 0.5f));
+            voiceBuffer.setSize(1, samplesPerBlock);
         }
         
     private:
         float frequency = 440.0f;
         float level = 0.0f;
-        float currentAngle = 0.0f;
-        float angleDelta = 0.0f;
+        double sineCoeff = 0.0;
+        double sineCurrent = 0.0;
+        double sinePrevious = 0.0;
         juce::ADSR adsr;
+        juce::AudioBuffer<float> voiceBuffer { 1, 512 };
     };
     
     class SynthSound : public juce::SynthesiserSound {
@@ -1404,10 +1695,35 @@ private:
     // Parameters
     juce::AudioProcessorValueTreeState parameters;
     
+    // Raw value pointers looked up once - getRawParameterValue() is a string-keyed
+    // map lookup and must not run per block on the audio thread
+    std::atomic<float>* lfoAmountParam     = parameters.getRawParameterValue("lfo_amount");
+    std::atomic<float>* cutoffParam        = parameters.getRawParameterValue("cutoff");
+    std::atomic<float>* resonanceParam     = parameters.getRawParameterValue("resonance");
+    std::atomic<float>* filterTypeParam    = parameters.getRawParameterValue("filter_type");
+    std::atomic<float>* delayTimeParam     = parameters.getRawParameterValue("delay_time");
+    std::atomic<float>* delayFeedbackParam = parameters.getRawParameterValue("delay_feedback");
+    std::atomic<float>* reverbSizeParam    = parameters.getRawParameterValue("reverb_size");
+    std::atomic<float>* reverbDampingParam = parameters.getRawParameterValue("reverb_damping");
+    std::atomic<float>* gainParam          = parameters.getRawParameterValue("gain");
+    std::atomic<float>* lfoRateParam       = parameters.getRawParameterValue("lfo_rate");
+    
     // Current processing state
     double currentSampleRate = 44100.0;
     int currentSamplesPerBlock = 512;
     
+    // Samples between LFO cutoff updates in processBlock
+    static constexpr int lfoControlInterval = 32;
+    
+    // Silence detection for skipping delay/reverb (audio thread only)
+    static constexpr float silenceThreshold = 1.0e-6f;
+    static constexpr double reverbTailSeconds = 8.0;
+    int effectsTailSamples = 0;
+    int effectsTailRemaining = 0;
+    
+    // DirtyGroup bits set by parameterChanged, consumed by processBlock
+    std::atomic<juce::uint32> dirtyGroups { 0 };
+    
     JUCE_DECLARE_NON_COPYABLE_WITH_LEAK_DETECTOR(ModernAudioProcessor)
 };"""
     }
@@ -1432,6 +1748,12 @@ DSPFILTERS_EXAMPLES = [
 #include "DSPFilters/LinkwitzRiley.h"
 #include "DSPFilters/RBJ.h"
 
+// 1 = Soft saturation uses juce::dsp::FastMathApproximations::tanh instead of
+// std::tanh; keep 0 to null-test against the exact curve
+#ifndef USE_FAST_TANH
+ #define USE_FAST_TANH 0
+#endif
+
 class DSPFiltersProcessor : public juce::AudioProcessor {
 public:
     DSPFiltersProcessor()
@@ -1447,9 +1769,20 @@ public:
         parameters.addParameterListener("filter_order", this);
         parameters.addParameterListener("ripple", this);
         parameters.addParameterListener("stopband", this);
+        parameters.addParameterListener("saturation_kind", this);
+        updateSaturationKind(static_cast<int>(saturationKindParam->load()));
+        
+        // Stereo storage up front; prepareToPlay only ever grows it
+        ensureChannelCapacity(2);
         
         // Initialize state variable filter for modulation
         initializeStateVariableFilter();
+        
+        filterDesigner.startThread();
+    }
+    
+    ~DSPFiltersProcessor() override {
+        filterDesigner.stopThread(1000);
     }
     
     juce::AudioProcessorValueTreeState::ParameterLayout createParameterLayout() {
@@ -1542,6 +1875,11 @@ public:
             juce::NormalisableRange<float>(0.0f, 1.0f, 0.01f), 0.0f
         ));
         
+        layout.add(std::make_unique<juce::AudioParameterChoice>(
+            "saturation_kind", "Saturation",
+            juce::StringArray{"Soft", "Fast", "Hard"}, 1
+        ));
+        
         // Mix parameters
         layout.add(std::make_unique<juce::AudioParameterFloat>(
             "dry_wet", "Dry/Wet Mix",
@@ -1565,97 +1903,105 @@ public:
         currentSampleRate = sampleRate;
         currentSamplesPerBlock = samplesPerBlock;
         
+        // One filter history per channel, independent of the coefficient banks
+        ensureChannelCapacity(juce::jmax(getTotalNumInputChannels(), getTotalNumOutputChannels()));
+        for (auto& state : filterStates) {
+            state.reset();
+        }
+        for (auto& state : cascadeStates) {
+            state.reset();
+        }
+        for (auto& svf : svfFilters) {
+            svf.reset();
+        }
+        
         // Update all filters with new sample rate
         updateAllFilters();
         
         // Prepare modulation LFO
         modulationLFO.prepare(sampleRate);
-        modulationLFO.setFrequency(parameters.getRawParameterValue("mod_rate")->load());
+        modulationLFO.setFrequency(modRateParam->load(std::memory_order_relaxed));
         
         // Prepare saturation
         saturation.prepare({sampleRate, (juce::uint32)samplesPerBlock, 
                            (juce::uint32)getTotalNumOutputChannels()});
         
         // Prepare gain
-        outputGain.prepare({sampleRate, (juce::uint32)samplesPerBlock,
-                           (juce::uint32)getTotalNumOutputChannels()});
-        updateOutputGain();
+        outputGainLinear.reset(sampleRate, 0.05);
+        outputGainLinear.setCurrentAndTargetValue(
+            juce::Decibels::decibelsToGain(outputGainParam->load(std::memory_order_relaxed)));
         
-        // Allocate processing buffers
-        dryBuffer.setSize(getTotalNumOutputChannels(), samplesPerBlock);
-        wetBuffer.setSize(getTotalNumOutputChannels(), samplesPerBlock);
-        tempBuffer.setSize(getTotalNumOutputChannels(), samplesPerBlock);
+        // Cutoff glide between blocks
+        smoothedCutoff.reset(sampleRate, 0.05);
+        smoothedCutoff.setCurrentAndTargetValue(cutoffParam->load(std::memory_order_relaxed));
     }
     
     void processBlock(juce::AudioBuffer<float>& buffer, juce::MidiBuffer& midiMessages) override {
         juce::ScopedNoDenormals noDenormals;
         
-        // Store dry signal for mixing
-        dryBuffer.makeCopyOf(buffer, true);
-        
-        // Clear wet buffer
-        wetBuffer.clear();
+        // Pick up coefficients designed since the last block
+        adoptLatestFilterBank();
         
-        // Apply modulation to cutoff if enabled
-        float modAmount = parameters.getRawParameterValue("mod_amount")->load();
-        if (modAmount > 0.001f) {
-            float baseCutoff = parameters.getRawParameterValue("cutoff")->load();
-            float modValue = modulationLFO.getNextSample() * modAmount * baseCutoff;
-            float modulatedCutoff = juce::jlimit(20.0f, 20000.0f, baseCutoff + modValue);
-            applyTemporaryCutoff(modulatedCutoff);
-        }
+        updateOutputGain();
         
-        // Process each channel
-        for (int channel = 0; channel < buffer.getNumChannels(); ++channel) {
-            auto* channelData = buffer.getWritePointer(channel);
-            auto* wetData = wetBuffer.getWritePointer(channel);
+        updateFilterTarget(buffer.getNumSamples());
+        
+        // Storage was sized in prepareToPlay; never resize here
+        jassert((size_t)buffer.getNumChannels() <= wetChannels.size());
+        const int numChannels = juce::jmin(buffer.getNumChannels(), (int)wetChannels.size());
+        const int numSamples = buffer.getNumSamples();
+        const float drive = driveParam->load(std::memory_order_relaxed);
+        const float dryWetMix = dryWetParam->load(std::memory_order_relaxed);
+        auto* const* channels = buffer.getArrayOfWritePointers();
+        auto* const* wet = wetChannels.data();
+        
+        // Filter, saturate, mix and apply gain one tile at a time: the wet
+        // signal stays in L1 from the filter to the output instead of being
+        // streamed through separate whole-block dry, wet and temp copies
+        for (int start = 0; start < numSamples; start += tileSize) {
+            const int tileSamples = juce::jmin(tileSize, numSamples - start);
             
-            // Copy input to temp buffer for processing
-            tempBuffer.copyFrom(channel, 0, buffer, channel, 0, buffer.getNumSamples());
+            for (int channel = 0; channel < numChannels; ++channel) {
+                juce::FloatVectorOperations::copy(wet[channel], channels[channel] + start, tileSamples);
+                applyFilterToChannel(channel, wet[channel], tileSamples);
+            }
             
-            // Apply selected filter
-            applyFilterToChannel(channel, tempBuffer.getNumSamples());
+            // Apply drive/saturation to all channels in one pass
+            if (drive > 0.01f) {
+                applySaturation(drive, numChannels, tileSamples);
+            }
             
-            // Copy processed data to wet buffer
-            wetBuffer.copyFrom(channel, 0, tempBuffer, channel, 0, buffer.getNumSamples());
+            // Output gain ramp, shared by all channels
+            alignas(32) float gain[tileSize];
+            for (int i = 0; i < tileSamples; ++i) {
+                gain[i] = outputGainLinear.getNextValue();
+            }
             
-            // Apply drive/saturation
-            if (parameters.getRawParameterValue("drive")->load() > 0.01f) {
-                applySaturationToChannel(channel, wetBuffer.getNumSamples());
+            // Mix dry and wet signals into the output
+            for (int channel = 0; channel < numChannels; ++channel) {
+                auto* out = channels[channel] + start;
+                const auto* wetData = wet[channel];
+                for (int i = 0; i < tileSamples; ++i) {
+                    out[i] = (out[i] * (1.0f - dryWetMix) + wetData[i] * dryWetMix) * gain[i];
+                }
             }
         }
-        
-        // Mix dry and wet signals
-        float dryWetMix = parameters.getRawParameterValue("dry_wet")->load();
-        for (int channel = 0; channel < buffer.getNumChannels(); ++channel) {
-            buffer.addFrom(channel, 0, dryBuffer, channel, 0, 
-                          buffer.getNumSamples(), 1.0f - dryWetMix);
-            buffer.addFrom(channel, 0, wetBuffer, channel, 0,
-                          buffer.getNumSamples(), dryWetMix);
-        }
-        
-        // Apply output gain
-        juce::dsp::AudioBlock<float> block(buffer);
-        juce::dsp::ProcessContextReplacing<float> context(block);
-        outputGain.process(context);
     }
     
     void parameterChanged(const juce::String& parameterID, float newValue) override {
-        if (parameterID == "filter_type") {
-            updateFilterType(static_cast<int>(newValue));
-        } else if (parameterID == "cutoff" || parameterID == "resonance" || 
-                   parameterID == "filter_order" || parameterID == "ripple" || 
-                   parameterID == "stopband" || parameterID == "bandwidth" || 
-                   parameterID == "q_factor") {
-            updateCurrentFilter();
-        } else if (parameterID == "mod_rate") {
+        // Filter parameters need no handling here: updateFilterTarget reads
+        // them all into one FilterSpec at the next block boundary
+        if (parameterID == "mod_rate") {
             modulationLFO.setFrequency(newValue);
-        } else if (parameterID == "output_gain") {
-            updateOutputGain();
+        } else if (parameterID == "saturation_kind") {
+            updateSaturationKind(static_cast<int>(newValue));
         }
     }
     
 private:
+    struct FilterSpec;
+    struct FilterBank;
+    
     void initializeFilters() {
         // Initialize DSPFilters parameters
         Dsp::Params params;
@@ -1664,13 +2010,12 @@ private:
         params[2] = 1000.0f;  // 1kHz cutoff
         params[3] = 0.707f;   // Q
         
-        // Butterworth filters
-        butterworthLP.setParams(params);
-        butterworthLP.setup();
-        
-        butterworthHP.setParams(params);
-        butterworthHP.setup();
+        // Active filter coefficients, in every bank so any of them can be swapped in
+        for (auto& bank : filterBanks.all()) {
+            designFilterBank(bank, makeFilterSpec(cutoffParam->load(std::memory_order_relaxed)));
+        }
         
+        // Butterworth filters
         butterworthBP.setParams(params);
         butterworthBP.setup();
         
@@ -1688,151 +2033,342 @@ private:
         // Initialize other filter types...
     }
     
+    // Per-channel filter state and the wet signal scratch (one tile per
+    // channel). Only grows, and keeps the allocation when the size is reached.
+    void ensureChannelCapacity(int numChannels) {
+        if ((size_t)numChannels > filterStates.size()) {
+            filterStates.resize((size_t)numChannels);
+            cascadeStates.resize((size_t)numChannels);
+            wetTiles.resize((size_t)numChannels);
+            
+            // New channels take over the current tuning with a cleared state
+            const auto firstNew = svfFilters.size();
+            svfFilters.resize((size_t)numChannels, svfFilters.empty() ? StateVariableFilter() : svfFilters.front());
+            for (auto channel = firstNew; channel < svfFilters.size(); ++channel) {
+                svfFilters[channel].reset();
+            }
+            
+            wetChannels.resize((size_t)numChannels);
+            for (size_t channel = 0; channel < wetTiles.size(); ++channel) {
+                wetChannels[channel] = wetTiles[channel].samples;
+            }
+        }
+    }
+    
     void initializeStateVariableFilter() {
         // State variable filter for modulation effects
-        svfFilter.setSampleRate(currentSampleRate);
-        svfFilter.setCutoff(parameters.getRawParameterValue("cutoff")->load());
-        svfFilter.setResonance(parameters.getRawParameterValue("resonance")->load());
-        svfFilter.setMode(StateVariableFilter::Mode::Lowpass);
+        for (auto& svf : svfFilters) {
+            svf.setSampleRate(currentSampleRate);
+            svf.setCutoff(cutoffParam->load(std::memory_order_relaxed));
+            svf.setResonance(resonanceParam->load(std::memory_order_relaxed));
+            svf.setMode(StateVariableFilter::Mode::Lowpass);
+        }
     }
     
     void updateAllFilters() {
-        Dsp::Params params;
-        params[0] = currentSampleRate;
-        params[1] = getFilterOrder();
-        params[2] = parameters.getRawParameterValue("cutoff")->load();
-        params[3] = parameters.getRawParameterValue("resonance")->load();
-        
-        // Update Butterworth
-        butterworthLP.setParams(params);
-        butterworthLP.setup();
-        
-        // Update other filters...
+        // Audio is stopped here, so the active bank can be designed in place
+        // for the new sample rate; the first block requests the rest
+        auto& bank = filterBanks.front();
+        designFilterBank(bank, makeFilterSpec(cutoffParam->load(std::memory_order_relaxed)));
+        
+        // Update state variable filters
+        for (auto& svf : svfFilters) {
+            svf.setSampleRate(currentSampleRate);
+            svf.setCutoff(bank.spec.cutoff);
+            svf.setResonance(bank.spec.resonance);
+        }
         
-        // Update state variable filter
-        svfFilter.setSampleRate(currentSampleRate);
-        svfFilter.setCutoff(params[2]);
-        svfFilter.setResonance(params[3]);
+        requestedSpec = {};
     }
     
-    void updateFilterType(int typeIndex) {
-        currentFilterType = typeIndex;
-        updateCurrentFilter();
+    // Once per block: all filter parameters are gathered into one FilterSpec,
+    // however many automation events arrived since the last block. The cutoff
+    // glides towards its target and a new design is only requested when the
+    // filter shape changed, the cutoff moved by more than 1%, or the glide
+    // has just settled.
+    void updateFilterTarget(int numSamples) {
+        smoothedCutoff.setTargetValue(cutoffParam->load(std::memory_order_relaxed));
+        const float baseCutoff = smoothedCutoff.skip(numSamples);
+        float cutoff = baseCutoff;
+        
+        // Apply modulation to cutoff if enabled
+        const float modAmount = modAmountParam->load(std::memory_order_relaxed);
+        if (modAmount > 0.001f) {
+            const float modValue = modulationLFO.getNextSample() * modAmount * cutoff;
+            cutoff = juce::jlimit(20.0f, 20000.0f, cutoff + modValue);
+        }
+        
+        const auto spec = makeFilterSpec(cutoff);
+        auto shape = spec;
+        shape.cutoff = requestedSpec.cutoff;
+        
+        const bool reshaped = !(shape == requestedSpec);
+        const bool moved = std::abs(cutoff - requestedSpec.cutoff) > 0.01f * requestedSpec.cutoff;
+        // Land exactly on the glide target once; judged on the unmodulated
+        // cutoff, since the modulated one differs on practically every block
+        const bool settled = !smoothedCutoff.isSmoothing() && baseCutoff != requestedBaseCutoff;
+        if (reshaped || moved || settled) {
+            // No setup() and no allocation here: hand the spec to the designer
+            requestedSpec = spec;
+            requestedBaseCutoff = baseCutoff;
+            filterSpecs.back() = spec;
+            filterSpecs.publish();
+        }
     }
     
-    void updateCurrentFilter() {
-        Dsp::Params params;
-        params[0] = currentSampleRate;
-        params[1] = getFilterOrder();
-        params[2] = parameters.getRawParameterValue("cutoff")->load();
-        
-        switch(currentFilterType) {
-            case 0: // Butterworth Lowpass
-                params[3] = parameters.getRawParameterValue("resonance")->load();
-                butterworthLP.setParams(params);
-                butterworthLP.setup();
-                break;
-                
-            case 1: // Butterworth Highpass
-                params[3] = parameters.getRawParameterValue("resonance")->load();
-                butterworthHP.setParams(params);
-                butterworthHP.setup();
-                break;
-                
-            case 16: // Linkwitz-Riley Lowpass
-                params[3] = 0.5f; // Fixed for Linkwitz-Riley
-                linkwitzRileyLP.setParams(params);
-                linkwitzRileyLP.setup();
-                break;
-                
-            case 22: // State Variable
-                svfFilter.setCutoff(params[2]);
-                svfFilter.setResonance(parameters.getRawParameterValue("resonance")->load());
-                break;
+    // Designer thread: builds the coefficients for the latest spec into the
+    // back bank and publishes it for the audio thread
+    void designPendingFilterBank() {
+        if (!filterSpecs.acquire()) {
+            return;
         }
+        const auto& spec = filterSpecs.front();
+        if (spec == lastDesignedSpec) {
+            return;
+        }
+        lastDesignedSpec = spec;
+        
+        designFilterBank(filterBanks.back(), spec);
+        filterBanks.publish();
     }
     
-    void applyFilterToChannel(int channel, int numSamples) {
-        auto* channelData = tempBuffer.getWritePointer(channel);
+    // Audio thread: swaps the front bank for the latest published one, if any
+    void adoptLatestFilterBank() {
+        if (!filterBanks.acquire()) {
+            return;
+        }
         
-        switch(currentFilterType) {
-            case 0: // Butterworth Lowpass
-                butterworthLP.process(numSamples, &channelData);
-                break;
-                
-            case 1: // Butterworth Highpass
-                butterworthHP.process(numSamples, &channelData);
-                break;
-                
-            case 16: // Linkwitz-Riley Lowpass
-                linkwitzRileyLP.process(numSamples, &channelData);
-                break;
-                
-            case 22: // State Variable
-                for (int i = 0; i < numSamples; ++i) {
-                    channelData[i] = svfFilter.process(channelData[i]);
-                }
-                break;
-                
-            default:
-                // Default to Butterworth lowpass
-                butterworthLP.process(numSamples, &channelData);
-                break;
+        // The state variable filter is cheap to retune and keeps its own state
+        const auto& bank = filterBanks.front();
+        if (bank.process == &processStateVariable) {
+            for (auto& svf : svfFilters) {
+                svf.setCutoff(bank.spec.cutoff);
+                svf.setResonance(bank.spec.resonance);
+            }
         }
     }
     
-    void applySaturationToChannel(int channel, int numSamples) {
-        auto* channelData = wetBuffer.getWritePointer(channel);
-        float drive = parameters.getRawParameterValue("drive")->load();
+    FilterSpec makeFilterSpec(float cutoff) {
+        return { static_cast<int>(filterTypeParam->load(std::memory_order_relaxed)), getFilterOrder(),
+                 cutoff, resonanceParam->load(std::memory_order_relaxed), currentSampleRate };
+    }
+    
+    // DSPFilters setup() recomputes every pole and zero of the cascade, so it
+    // only ever runs here, on a bank the audio thread is not using
+    static void designFilterBank(FilterBank& bank, const FilterSpec& spec) {
+        Dsp::Params params;
+        params[0] = spec.sampleRate;
+        params[1] = spec.order;
+        params[2] = spec.cutoff;
+        params[3] = spec.resonance;
+        bank.spec = spec;
+        
+        // Indexed by filter_type; types without a dedicated path fall back
+        // to the Butterworth lowpass
+        using DesignFn = void (*)(FilterBank&, Dsp::Params&);
+        static constexpr std::array<DesignFn, 24> designByType = {
+            &designButterworthLP, &designButterworthHP, &designButterworthLP,   // Butterworth
+            &designButterworthLP, &designButterworthLP, &designButterworthLP,   // Chebyshev I
+            &designButterworthLP, &designButterworthLP, &designButterworthLP,   // Chebyshev II
+            &designButterworthLP, &designButterworthLP, &designButterworthLP,   // Elliptic
+            &designButterworthLP, &designButterworthLP, &designButterworthLP,   // Bessel
+            &designLinkwitzRileyLP, &designButterworthLP,                       // Linkwitz-Riley
+            &designButterworthLP, &designButterworthLP, &designButterworthLP,   // RBJ
+            &designButterworthLP, &designButterworthLP, &designButterworthLP,
+            &designStateVariable
+        };
+        designByType[(size_t)juce::jlimit(0, (int)designByType.size() - 1, spec.type)](bank, params);
+    }
+    
+    // Each design function also picks the bank's process function, so the
+    // audio thread makes one indirect call per channel instead of switching
+    // on the filter type (and order) for every channel of every tile
+    static void designButterworthLP(FilterBank& bank, Dsp::Params& params) {
+        bank.butterworthLP.setParams(params);
+        bank.butterworthLP.setup();
+        bank.lowpassCascade.setCoefficients(bank.butterworthLP);
+        bank.process = bank.spec.order >= CascadedBiquad::minOrder ? &processLowpassCascade : &processButterworthLP;
+    }
+    
+    static void designButterworthHP(FilterBank& bank, Dsp::Params& params) {
+        bank.butterworthHP.setParams(params);
+        bank.butterworthHP.setup();
+        bank.process = &processButterworthHP;
+    }
+    
+    static void designLinkwitzRileyLP(FilterBank& bank, Dsp::Params& params) {
+        params[3] = 0.5f; // Fixed for Linkwitz-Riley
+        bank.linkwitzRileyLP.setParams(params);
+        bank.linkwitzRileyLP.setup();
+        bank.process = &processLinkwitzRileyLP;
+    }
+    
+    // Retuned on adoption, see adoptLatestFilterBank
+    static void designStateVariable(FilterBank& bank, Dsp::Params&) {
+        bank.process = &processStateVariable;
+    }
+    
+    static void processButterworthLP(DSPFiltersProcessor& p, FilterBank& bank, int channel, float* samples, int numSamples) {
+        bank.butterworthLP.process(numSamples, samples, p.filterStates[(size_t)channel]);
+    }
+    
+    static void processLowpassCascade(DSPFiltersProcessor& p, FilterBank& bank, int channel, float* samples, int numSamples) {
+        bank.lowpassCascade.processBlock(samples, numSamples, p.cascadeStates[(size_t)channel]);
+    }
+    
+    static void processButterworthHP(DSPFiltersProcessor& p, FilterBank& bank, int channel, float* samples, int numSamples) {
+        bank.butterworthHP.process(numSamples, samples, p.filterStates[(size_t)channel]);
+    }
+    
+    static void processLinkwitzRileyLP(DSPFiltersProcessor& p, FilterBank& bank, int channel, float* samples, int numSamples) {
+        bank.linkwitzRileyLP.process(numSamples, samples, p.filterStates[(size_t)channel]);
+    }
+    
+    static void processStateVariable(DSPFiltersProcessor& p, FilterBank&, int channel, float* samples, int numSamples) {
+        p.svfFilters[(size_t)channel].processBlock(samples, numSamples);
+    }
+    
+    void applyFilterToChannel(int channel, float* channelData, int numSamples) {
+        auto& bank = filterBanks.front();
+        bank.process(*this, bank, channel, channelData, numSamples);
+    }
+    
+    void applySaturation(float drive, int numChannels, int numSamples) {
+        const float driveGain = 1.0f + drive * 3.0f;
+        saturateFn.load(std::memory_order_relaxed)(wetChannels.data(),
+                                                   numChannels, numSamples, driveGain);
+    }
+    
+    // One instantiation per curve with the curve inlined, so choosing the
+    // curve costs one indirect call per block and the loops stay vectorisable.
+    // Stereo runs both channels through the same loop: two independent
+    // streams per iteration and a single loop preamble.
+    template <float (*Shape)(float)>
+    static void saturate(float* const* channels, int numChannels, int numSamples, float driveGain) {
+        if (numChannels == 2) {
+            auto* left = channels[0];
+            auto* right = channels[1];
+            for (int i = 0; i < numSamples; ++i) {
+                left[i] = Shape(left[i] * driveGain);
+                right[i] = Shape(right[i] * driveGain);
+            }
+            return;
+        }
         
-        // Simple soft clipping saturation
-        for (int i = 0; i < numSamples; ++i) {
-            float x = channelData[i] * (1.0f + drive * 3.0f);
-            channelData[i] = std::tanh(x);
+        for (int channel = 0; channel < numChannels; ++channel) {
+            auto* channelData = channels[channel];
+            for (int i = 0; i < numSamples; ++i) {
+                channelData[i] = Shape(channelData[i] * driveGain);
+            }
         }
     }
     
-    void applyTemporaryCutoff(float cutoff) {
-        // Temporarily change cutoff for modulation
-        Dsp::Params params;
-        params[0] = currentSampleRate;
-        params[1] = getFilterOrder();
-        params[2] = cutoff;
-        params[3] = parameters.getRawParameterValue("resonance")->load();
-        
-        switch(currentFilterType) {
-            case 0:
-                butterworthLP.setParams(params);
-                butterworthLP.setup();
-                break;
-            case 22:
-                svfFilter.setCutoff(cutoff);
-                break;
+    using SaturateFn = void (*)(float* const*, int, int, float);
+    
+    // Called from parameterChanged, possibly while the audio thread saturates
+    void updateSaturationKind(int kind) {
+        static constexpr SaturateFn kinds[] = { &saturate<softClip>, &saturateFast, &saturate<hardClip> };
+        saturateFn.store(kinds[juce::jlimit(0, 2, kind)], std::memory_order_relaxed);
+    }
+    
+    // Fast: fastTanh four samples at a time, with p / sqrt(p * p + 1) done as
+    // a hardware reciprocal square root estimate (12 bits) refined by one
+    // Newton-Raphson step - close to full float precision, no divide or sqrt
+    static void saturateFast(float* const* channels, int numChannels, int numSamples, float driveGain) {
+       #if JUCE_USE_SSE_INTRINSICS || JUCE_USE_ARM_NEON
+        const int vectorSamples = numSamples & ~3;
+        for (int channel = 0; channel < numChannels; ++channel) {
+            auto* channelData = channels[channel];
+            jassert(reinterpret_cast<std::uintptr_t>(channelData) % WetTile::alignment == 0);
+            for (int i = 0; i < vectorSamples; i += 4) {
+                fastTanh4(channelData + i, driveGain);
+            }
+            for (int i = vectorSamples; i < numSamples; ++i) {
+                channelData[i] = fastTanh(channelData[i] * driveGain);
+            }
         }
+       #else
+        saturate<fastTanh>(channels, numChannels, numSamples, driveGain);
+       #endif
+    }
+    
+   #if JUCE_USE_SSE_INTRINSICS
+    static void fastTanh4(float* samples, float driveGain) {
+        __m128 x = _mm_mul_ps(_mm_load_ps(samples), _mm_set1_ps(driveGain));
+        x = _mm_min_ps(_mm_max_ps(x, _mm_set1_ps(-9.0f)), _mm_set1_ps(9.0f));
+        const __m128 x2 = _mm_mul_ps(x, x);
+        __m128 p = _mm_add_ps(_mm_mul_ps(_mm_set1_ps(0.2344393379e-3f), x2), _mm_set1_ps(8.205501647e-3f));
+        p = _mm_add_ps(_mm_mul_ps(p, x2), _mm_set1_ps(0.1667961930f));
+        p = _mm_add_ps(_mm_mul_ps(p, x2), _mm_set1_ps(0.999972863f));
+        p = _mm_mul_ps(p, x);
+        
+        // r = 1 / sqrt(q), refined as r * (3 - q * r * r) / 2
+        const __m128 q = _mm_add_ps(_mm_mul_ps(p, p), _mm_set1_ps(1.0f));
+        __m128 r = _mm_rsqrt_ps(q);
+        r = _mm_mul_ps(_mm_mul_ps(_mm_set1_ps(0.5f), r),
+                       _mm_sub_ps(_mm_set1_ps(3.0f), _mm_mul_ps(_mm_mul_ps(q, r), r)));
+        _mm_store_ps(samples, _mm_mul_ps(p, r));
+    }
+   #elif JUCE_USE_ARM_NEON
+    static void fastTanh4(float* samples, float driveGain) {
+        float32x4_t x = vmulq_n_f32(vld1q_f32(samples), driveGain);
+        x = vminq_f32(vmaxq_f32(x, vdupq_n_f32(-9.0f)), vdupq_n_f32(9.0f));
+        const float32x4_t x2 = vmulq_f32(x, x);
+        float32x4_t p = vmlaq_f32(vdupq_n_f32(8.205501647e-3f), x2, vdupq_n_f32(0.2344393379e-3f));
+        p = vmlaq_f32(vdupq_n_f32(0.1667961930f), p, x2);
+        p = vmlaq_f32(vdupq_n_f32(0.999972863f), p, x2);
+        p = vmulq_f32(p, x);
+        
+        // vrsqrts(q * r, r) = (3 - q * r * r) / 2: one Newton-Raphson step
+        const float32x4_t q = vmlaq_f32(vdupq_n_f32(1.0f), p, p);
+        float32x4_t r = vrsqrteq_f32(q);
+        r = vmulq_f32(r, vrsqrtsq_f32(vmulq_f32(q, r), r));
+        vst1q_f32(samples, vmulq_f32(p, r));
+    }
+   #endif
+    
+    // Soft: exact tanh (one libm call per sample), or JUCE's inlineable Pade
+    // approximation with USE_FAST_TANH - only accurate on [-5, 5], where
+    // tanh has already reached 0.9999, hence the clamp
+    static float softClip(float x) {
+       #if USE_FAST_TANH
+        return juce::dsp::FastMathApproximations::tanh(juce::jlimit(-5.0f, 5.0f, x));
+       #else
+        return std::tanh(x);
+       #endif
+    }
+    
+    // Hard: clamp to [-1, 1] - a single min/max pair, the cheapest option
+    static float hardClip(float x) {
+        return std::min(std::max(x, -1.0f), 1.0f);
+    }
+    
+    // tanh(x) = sinh(x) / sqrt(sinh(x)^2 + 1), with sinh approximated by an odd
+    // polynomial - a few multiplies and one square root, no transcendental.
+    // Beyond |x| = 9 tanh is 1.0f in float precision, so the input is clamped
+    // there first (min/max, no branch): the polynomial's p * p would otherwise
+    // overflow for large drive and turn the result into inf / inf.
+    static inline float fastTanh(float x) {
+        x = std::min(std::max(x, -9.0f), 9.0f);
+        const float x2 = x * x;
+        const float p = x * (((0.2344393379e-3f * x2 + 8.205501647e-3f) * x2 + 0.1667961930f) * x2 + 0.999972863f);
+        return p / std::sqrt(p * p + 1.0f);
     }
     
+    // Once per block on the audio thread; the ramp smooths the change
     void updateOutputGain() {
-        float gainDb = parameters.getRawParameterValue("output_gain")->load();
-        outputGain.setGainDecibels(gainDb);
+        float gainDb = outputGainParam->load(std::memory_order_relaxed);
+        outputGainLinear.setTargetValue(juce::Decibels::decibelsToGain(gainDb));
     }
     
-    int getFilterOrder() {
-        int orderIndex = static_cast<int>(parameters.getRawParameterValue("filter_order")->load());
-        switch(orderIndex) {
-            case 0: return 1;
-            case 1: return 2;
-            case 2: return 3;
-            case 3: return 4;
-            case 4: return 6;
-            case 5: return 8;
-            case 6: return 12;
-            default: return 4;
-        }
+    // Filter order for each filter_order choice
+    [[nodiscard]] int getFilterOrder() const {
+        static constexpr int orders[] = { 1, 2, 3, 4, 6, 8, 12 };
+        const int orderIndex = static_cast<int>(filterOrderParam->load(std::memory_order_relaxed));
+        return orders[juce::jlimit(0, 6, orderIndex)];
     }
     
     // DSPFilters objects
-    Dsp::Butterworth::LowPass<12> butterworthLP;
-    Dsp::Butterworth::HighPass<12> butterworthHP;
     Dsp::Butterworth::BandPass<12> butterworthBP;
     
     Dsp::ChebyshevI::LowPass<12> chebyshevILP;
@@ -1851,7 +2387,6 @@ private:
     Dsp::Bessel::HighPass<12> besselHP;
     Dsp::Bessel::BandPass<12> besselBP;
     
-    Dsp::LinkwitzRiley::LowPass<4> linkwitzRileyLP;
     Dsp::LinkwitzRiley::HighPass<4> linkwitzRileyHP;
     
     Dsp::RBJ::LowPass rbjLP;
@@ -1861,13 +2396,85 @@ private:
     Dsp::RBJ::AllPass rbjAllPass;
     Dsp::RBJ::Peaking rbjPeaking;
     
-    // State Variable Filter
-    class StateVariableFilter {
+    // Biquad cascade processed as a systolic pipeline: at each step stage k
+    // filters sample (step - k), fed by what stage k-1 produced one step
+    // earlier. A block of N samples through K stages then takes N + K - 1
+    // steps in which all active stages are independent, so the inner stage
+    // loop vectorizes instead of running the stages one after another.
+    class CascadedBiquad {
     public:
-        enum class Mode { Lowpass, Highpass, Bandpass, Notch };
+        static constexpr int maxStages = 6;  // 12th order
+        static constexpr int minOrder = 4;   // below this the pipeline is mostly fill and drain
         
-        void setSampleRate(double sr) {
-            sampleRate = sr;
+        // Filter history, one per channel on its own cache line (transposed direct form II)
+        struct alignas(64) State {
+            std::array<float, maxStages> s1 {}, s2 {};
+            void reset() { s1.fill(0.0f); s2.fill(0.0f); }
+        };
+        
+        // Copies the stage coefficients of a designed DSPFilters cascade
+        void setCoefficients(const Dsp::Cascade& cascade) {
+            numStages = juce::jmin(cascade.getNumStages(), maxStages);
+            for (int k = 0; k < numStages; ++k) {
+                const auto& stage = cascade[k];
+                const auto norm = 1.0 / stage.getA0();
+                b0[(size_t)k] = (float)(stage.getB0() * norm);
+                b1[(size_t)k] = (float)(stage.getB1() * norm);
+                b2[(size_t)k] = (float)(stage.getB2() * norm);
+                a1[(size_t)k] = (float)(stage.getA1() * norm);
+                a2[(size_t)k] = (float)(stage.getA2() * norm);
+            }
+        }
+        
+        void processBlock(float* samples, int numSamples, State& state) const {
+            if (numStages == 0) {
+                return;
+            }
+            
+            const int lastStage = numStages - 1;
+            std::array<float, maxStages> input {}, output {};
+            
+            for (int step = 0; step < numSamples + lastStage; ++step) {
+                // Stages still filling or already drained sit this step out
+                const int first = juce::jmax(0, step - numSamples + 1);
+                const int last = juce::jmin(lastStage, step);
+                
+                for (int k = last; k >= juce::jmax(first, 1); --k) {
+                    input[(size_t)k] = output[(size_t)k - 1];
+                }
+                if (first == 0) {
+                    input[0] = samples[step];
+                }
+                
+                // No dependency between stages within a step
+                for (int k = first; k <= last; ++k) {
+                    const auto i = (size_t)k;
+                    const float y = b0[i] * input[i] + state.s1[i];
+                    state.s1[i] = b1[i] * input[i] - a1[i] * y + state.s2[i];
+                    state.s2[i] = b2[i] * input[i] - a2[i] * y;
+                    output[i] = y;
+                }
+                
+                if (last == lastStage) {
+                    samples[step - lastStage] = output[(size_t)lastStage];
+                }
+            }
+        }
+        
+    private:
+        int numStages = 0;
+        std::array<float, maxStages> b0 {}, b1 {}, b2 {}, a1 {}, a2 {};
+    };
+    
+    // State Variable Filter
+    // One per channel, each on its own cache line
+    class alignas(64) StateVariableFilter {
+    public:
+        enum class Mode { Lowpass, Highpass, Bandpass, Notch };
+        
+        void setSampleRate(double sr) {
+            sampleRate = sr;
+            twoPiOverSampleRate = (float)(juce::MathConstants<double>::twoPi / sr);
             updateCoefficients();
         }
         
@@ -1885,19 +2492,22 @@ private:
             mode = m;
         }
         
-        float process(float input) {
-            // Standard state variable filter implementation
-            float hp = (input - r2 * bp - r1 * lp) / (1 + r1 * r2);
-            bp = hp * r1 + bp;
-            lp = bp * r1 + lp;
-            float notch = hp + lp;
-            
+        // Filters a block in place. The mode is resolved once per block, so
+        // the inner loop is the bare recurrence with no branches or division.
+        void processBlock(float* samples, int numSamples) {
             switch(mode) {
-                case Mode::Lowpass: return lp;
-                case Mode::Highpass: return hp;
-                case Mode::Bandpass: return bp;
-                case Mode::Notch: return notch;
-                default: return lp;
+                case Mode::Highpass:
+                    run(samples, numSamples, [](float hp, float, float) { return hp; });
+                    break;
+                case Mode::Bandpass:
+                    run(samples, numSamples, [](float, float bpOut, float) { return bpOut; });
+                    break;
+                case Mode::Notch:
+                    run(samples, numSamples, [](float hp, float, float lpOut) { return hp + lpOut; });
+                    break;
+                default:
+                    run(samples, numSamples, [](float, float, float lpOut) { return lpOut; });
+                    break;
             }
         }
         
@@ -1906,23 +2516,46 @@ private:
         }
         
     private:
+        template <typename Output>
+        void run(float* samples, int numSamples, Output output) {
+            // Standard state variable filter, state kept in registers for the block
+            const float g = r1, damping = r2, norm = invDenom;
+            float lpState = lp, bpState = bp;
+            
+            for (int i = 0; i < numSamples; ++i) {
+                const float hp = (samples[i] - damping * bpState - g * lpState) * norm;
+                bpState = hp * g + bpState;
+                lpState = bpState * g + lpState;
+                samples[i] = output(hp, bpState, lpState);
+            }
+            
+            lp = lpState;
+            bp = bpState;
+        }
+        
         void updateCoefficients() {
-            float w0 = 2.0f * 3.1415926535f * cutoff / sampleRate;
+            // 2 * pi / sampleRate is cached by setSampleRate, so a cutoff change
+            // costs a multiply here rather than another division
+            float w0 = twoPiOverSampleRate * cutoff;
             r1 = 1.0f / resonance;
             r2 = w0;
+            invDenom = 1.0f / (1.0f + r1 * r2);
         }
         
         float cutoff = 1000.0f;
         float resonance = 0.707f;
         double sampleRate = 44100.0;
+        float twoPiOverSampleRate = (float)(juce::MathConstants<double>::twoPi / 44100.0);
         float r1 = 0.0f, r2 = 0.0f;
+        float invDenom = 1.0f;
         float lp = 0.0f, bp = 0.0f;
         Mode mode = Mode::Lowpass;
     };
     
-    StateVariableFilter svfFilter;
+    std::vector<StateVariableFilter> svfFilters;
     
-    // Modulation LFO
+    // Modulation LFO: coupled-form oscillator that rotates (cos, sin) by the
+    // phase increment each sample - a few multiply-adds, no std::sin
     class LFO {
     public:
         void prepare(double sampleRate) {
@@ -1931,21 +2564,34 @@ private:
         
         void setFrequency(float freq) {
             frequency = freq;
-            phaseIncrement = (freq * 2.0f * 3.1415926535f) / sampleRate;
+            const float phaseIncrement = (freq * 2.0f * 3.1415926535f) / sampleRate;
+            cosIncrement = std::cos(phaseIncrement);
+            sinIncrement = std::sin(phaseIncrement);
         }
         
         float getNextSample() {
-            float value = std::sin(phase);
-            phase += phaseIncrement;
-            if (phase > 2.0f * 3.1415926535f) {
-                phase -= 2.0f * 3.1415926535f;
+            const float value = sinState;
+            const float c = cosState * cosIncrement - sinState * sinIncrement;
+            const float s = sinState * cosIncrement + cosState * sinIncrement;
+            cosState = c;
+            sinState = s;
+            
+            // Rounding slowly drifts the amplitude; pull it back onto the unit circle
+            if (++samplesSinceRenormalise == renormaliseInterval) {
+                samplesSinceRenormalise = 0;
+                const float k = 1.5f - 0.5f * (c * c + s * s);
+                cosState *= k;
+                sinState *= k;
             }
             return value;
         }
         
     private:
-        float phase = 0.0f;
-        float phaseIncrement = 0.0f;
+        static constexpr int renormaliseInterval = 4096;
+        
+        float cosState = 1.0f, sinState = 0.0f;
+        float cosIncrement = 1.0f, sinIncrement = 0.0f;
+        int samplesSinceRenormalise = 0;
         float frequency = 1.0f;
         double sampleRate = 44100.0;
     };
@@ -1954,18 +2600,134 @@ private:
     
     // DSP Modules
     juce::dsp::WaveShaper<float> saturation;
-    juce::dsp::Gain<float> outputGain;
+    juce::SmoothedValue<float> outputGainLinear;
+    juce::SmoothedValue<float> smoothedCutoff;
     
-    // Buffers
-    juce::AudioBuffer<float> dryBuffer;
-    juce::AudioBuffer<float> wetBuffer;
-    juce::AudioBuffer<float> tempBuffer;
+    // Wet signal scratch, one tile per channel. Each tile is 32-byte aligned
+    // (AudioBuffer only guarantees float alignment), so vector loops over it
+    // can use aligned loads and stores.
+    static constexpr int tileSize = 64;
+    
+    struct WetTile {
+        static constexpr size_t alignment = 32;
+        alignas(alignment) float samples[tileSize];
+    };
+    
+    std::vector<WetTile> wetTiles;
+    std::vector<float*> wetChannels;
     
     // Parameters
     juce::AudioProcessorValueTreeState parameters;
     
+    // Raw value pointers looked up once - getRawParameterValue() is a string-keyed
+    // map lookup and must not run per block on the audio thread
+    std::atomic<float>* modRateParam        = parameters.getRawParameterValue("mod_rate");
+    std::atomic<float>* modAmountParam      = parameters.getRawParameterValue("mod_amount");
+    std::atomic<float>* cutoffParam         = parameters.getRawParameterValue("cutoff");
+    std::atomic<float>* driveParam          = parameters.getRawParameterValue("drive");
+    std::atomic<float>* dryWetParam         = parameters.getRawParameterValue("dry_wet");
+    std::atomic<float>* resonanceParam      = parameters.getRawParameterValue("resonance");
+    std::atomic<float>* filterTypeParam     = parameters.getRawParameterValue("filter_type");
+    std::atomic<float>* outputGainParam     = parameters.getRawParameterValue("output_gain");
+    std::atomic<float>* filterOrderParam    = parameters.getRawParameterValue("filter_order");
+    std::atomic<float>* saturationKindParam = parameters.getRawParameterValue("saturation_kind");
+    
+    std::atomic<SaturateFn> saturateFn { &saturateFast };
+    
+    // Everything a filter design depends on - the spec handed to the
+    // designer once per block, and the state a bank was designed for
+    struct FilterSpec {
+        int type = -1;
+        int order = 0;
+        float cutoff = 0.0f;
+        float resonance = 0.0f;
+        double sampleRate = 0.0;
+        
+        bool operator==(const FilterSpec& other) const {
+            return type == other.type && order == other.order && cutoff == other.cutoff
+                && resonance == other.resonance && sampleRate == other.sampleRate;
+        }
+    };
+    
+    // Coefficients of the filters in use, designed by filterDesigner. The
+    // filter history lives in filterStates, so swapping banks never resets it.
+    struct FilterBank {
+        FilterSpec spec;
+        Dsp::Butterworth::LowPass<12> butterworthLP;
+        CascadedBiquad lowpassCascade;  // butterworthLP's stages, used from minOrder up
+        Dsp::Butterworth::HighPass<12> butterworthHP;
+        Dsp::LinkwitzRiley::LowPass<4> linkwitzRileyLP;
+        
+        using ProcessFn = void (*)(DSPFiltersProcessor&, FilterBank&, int channel, float* samples, int numSamples);
+        ProcessFn process = nullptr;  // set by designFilterBank for spec.type
+    };
+    
+    using FilterState = Dsp::CascadeStages<6>::State<Dsp::DirectFormII>;
+    
+    // Latest-value handoff between one producer and one consumer. The
+    // producer fills back() and publishes it, the consumer swaps the latest
+    // published slot into front(). Each side is a single index exchange -
+    // lock-free, nothing allocated, and a value is never torn.
+    template <typename T>
+    class TripleBuffer {
+    public:
+        T& front() { return slots[(size_t)frontIndex]; }
+        T& back()  { return slots[(size_t)backIndex]; }
+        
+        // Only while neither side is running
+        std::array<T, 3>& all() { return slots; }
+        
+        void publish() {
+            backIndex = latest.exchange(backIndex | newFlag, std::memory_order_acq_rel) & ~newFlag;
+        }
+        
+        // Returns true if front() now holds a newly published value
+        bool acquire() {
+            if ((latest.load(std::memory_order_relaxed) & newFlag) == 0) {
+                return false;
+            }
+            frontIndex = latest.exchange(frontIndex, std::memory_order_acq_rel) & ~newFlag;
+            return true;
+        }
+        
+    private:
+        static constexpr int newFlag = 4;
+        std::array<T, 3> slots {};
+        int frontIndex = 0;
+        int backIndex = 1;
+        std::atomic<int> latest { 2 };
+    };
+    
+    TripleBuffer<FilterSpec> filterSpecs;  // audio thread -> designer
+    TripleBuffer<FilterBank> filterBanks;  // designer -> audio thread
+    std::vector<FilterState> filterStates;
+    std::vector<CascadedBiquad::State> cascadeStates;
+    
+    FilterSpec requestedSpec;          // audio thread only
+    float requestedBaseCutoff = 0.0f;  // unmodulated cutoff of requestedSpec
+    FilterSpec lastDesignedSpec;       // designer thread only
+    
+    class FilterDesigner : public juce::Thread {
+    public:
+        explicit FilterDesigner(DSPFiltersProcessor& p) : juce::Thread("DSPFilters Designer"), owner(p) {}
+        
+        // Polls for new specs instead of being notified: notify() locks a
+        // mutex and signals a condition variable, which the audio thread must
+        // never do. An idle poll is one relaxed load in filterSpecs.acquire().
+        void run() override {
+            while (!threadShouldExit()) {
+                owner.designPendingFilterBank();
+                wait(1);
+            }
+        }
+        
+    private:
+        DSPFiltersProcessor& owner;
+    };
+    
+    FilterDesigner filterDesigner { *this };
+    
     // Current state
-    int currentFilterType = 0;
     double currentSampleRate = 44100.0;
     int currentSamplesPerBlock = 512;
     
@@ -1990,6 +2752,20 @@ KFR_EXAMPLES = [
 #include <kfr/simd.hpp>
 #include <kfr/version.hpp>
 
+#if JUCE_INTEL
+ #if JUCE_MSVC
+  #include <intrin.h>
+ #else
+  #include <x86intrin.h>
+ #endif
+#endif
+
+#if JUCE_LINUX || JUCE_MAC
+ #include <sys/mman.h>
+#elif JUCE_WINDOWS
+ #include <windows.h>
+#endif
+
 class KFRProcessor : public juce::AudioProcessor {
 public:
     KFRProcessor()
@@ -2006,6 +2782,15 @@ public:
         
         // Initialize SIMD detection
         detectSIMDCapabilities();
+        updateSIMDSettings();
+        
+        // Also calibrates the cycle counter, off the message thread
+        performanceLogger.startThread();
+    }
+    
+    ~KFRProcessor() override {
+        performanceLogger.stopThread(1000);
+        unlockHotBuffers();
     }
     
     juce::AudioProcessorValueTreeState::ParameterLayout createParameterLayout() {
@@ -2114,18 +2899,14 @@ public:
         
         // Start performance measurement
         if (performanceMonitorEnabled) {
-            processStartTime = juce::Time::getMillisecondCounterHiRes();
+            processStartTime = readCycleCounter();
         }
         
         // Convert JUCE buffer to KFR format
-        auto kfrBuffer = convertToKFRBuffer(buffer);
+        auto& kfrBuffer = convertToKFRBuffer(buffer);
         
-        // Apply SIMD optimizations if enabled
-        if (simdEnabled) {
-            processWithSIMDOptimizations(kfrBuffer);
-        } else {
-            processWithoutSIMD(kfrBuffer);
-        }
+        // Block kernel chosen by updateSIMDSettings
+        (this->*blockKernel)(kfrBuffer);
         
         // Apply spectral processing if enabled
         if (spectralProcessingEnabled) {
@@ -2147,7 +2928,7 @@ public:
         
         // End performance measurement
         if (performanceMonitorEnabled) {
-            processEndTime = juce::Time::getMillisecondCounterHiRes();
+            processEndTime = readCycleCounter();
             updatePerformanceStats();
         }
     }
@@ -2173,6 +2954,38 @@ public:
         }
     }
     
+    // Safe to call from the UI thread
+    // 0 until the cycle counter has been calibrated
+    double getLastProcessTimeMs() const {
+        const double rate = cyclesPerMs.load(std::memory_order_relaxed);
+        return rate > 0.0 ? static_cast<double>(lastProcessCycles.load(std::memory_order_relaxed)) / rate : 0.0;
+    }
+    
+    // IR for the convolution stage, e.g. from a file chosen in the editor.
+    // Kept so it survives the engine being recreated in prepareToPlay.
+    void loadImpulseResponse(const kfr::univector<float>& ir) {
+        if (&ir != &impulseResponse) {
+            impulseResponse = ir;
+        }
+        
+        irIsSilent = false;
+        irIsIdentity = false;
+        if (ir.empty()) return;  // nothing loaded yet
+        
+        // Classify the IR once here so the trivial cases never reach the
+        // convolution engine: a silent IR turns every block into silence and
+        // a unit impulse leaves it untouched
+        constexpr float threshold = 1.0e-6f;
+        const float absSum = kfr::sum(kfr::abs(ir));
+        irIsSilent = absSum < threshold;
+        irIsIdentity = !irIsSilent && std::abs(ir[0] - 1.0f) < threshold
+                                   && std::abs(absSum - 1.0f) < threshold;
+        
+        if (convolutionEngine && !irIsSilent && !irIsIdentity) {
+            convolutionEngine->set_data(ir);
+        }
+    }
+    
 private:
     void initializeKFRModules() {
         // Initialize KFR version info
@@ -2186,7 +2999,7 @@ private:
         
         // Initialize FFT planner
         fftSize = 1024;
-        fft = std::make_unique<kfr::dft_plan_real<float>>(fftSize);
+        fft = getOrCreatePlan(fftSize);
         
         // Initialize convolution engine
         convolutionEngine = std::make_unique<kfr::convolve_filter<float>>();
@@ -2238,7 +3051,7 @@ private:
         
         if (newFFTSize != fftSize) {
             fftSize = newFFTSize;
-            fft = std::make_unique<kfr::dft_plan_real<float>>(fftSize);
+            fft = getOrCreatePlan(fftSize);
             updateFFTWindow();
             
             juce::Logger::writeToLog("FFT size updated to: " + juce::String(fftSize));
@@ -2248,6 +3061,10 @@ private:
     void updateFFTWindow() {
         int windowType = static_cast<int>(parameters.getRawParameterValue("fft_window")->load());
         
+        // The old window's pages are freed below - release the locks first
+        // (allocateProcessingBuffers locks the new buffers again)
+        unlockHotBuffers();
+        
         // Create window function based on selection
         switch(windowType) {
             case 0: // Rectangular
@@ -2303,6 +3120,9 @@ private:
         convolutionEngine->set_max_ir_size(maxIrSamples);
         
         convolutionEnabled = maxIrSamples > 0;
+        
+        // A recreated engine starts empty - hand it the current IR again
+        loadImpulseResponse(impulseResponse);
     }
     
     void setupSpectralProcessor() {
@@ -2327,16 +3147,19 @@ private:
         // Configure analysis based on type
         switch(analysisType) {
             case 0: // Spectrum
-                analyzer = std::make_unique<SpectrumAnalyzer>(fftSize, currentSampleRate);
+                activeAnalyzer.emplace<SpectrumAnalyzer>(fftSize, currentSampleRate);
                 break;
             case 1: // Spectrogram
-                spectrogram = std::make_unique<Spectrogram>(fftSize, 256); // 256 frequency bins
+                activeAnalyzer.emplace<Spectrogram>(fftSize, 256); // 256 frames of history
                 break;
             case 2: // Waveform
-                waveformAnalyzer = std::make_unique<WaveformAnalyzer>(currentSamplesPerBlock);
+                activeAnalyzer.emplace<WaveformAnalyzer>(currentSamplesPerBlock);
                 break;
             case 5: // MFCC
-                mfccAnalyzer = std::make_unique<MFCCAnalyzer>(currentSampleRate, fftSize);
+                activeAnalyzer.emplace<MFCCAnalyzer>(currentSampleRate, fftSize);
+                break;
+            default:
+                activeAnalyzer.emplace<std::monostate>();
                 break;
         }
         
@@ -2344,6 +3167,10 @@ private:
     }
     
     void allocateProcessingBuffers(int blockSize) {
+        // The buffers below are replaced: drop the locks on the old pages so
+        // they do not keep counting against the memlock limit
+        unlockHotBuffers();
+        
         // Allocate KFR processing buffers
         inputBuffer = kfr::make_univector<float>(blockSize);
         outputBuffer = kfr::make_univector<float>(blockSize);
@@ -2351,16 +3178,70 @@ private:
         
         // Allocate frequency domain buffers
         spectrum = kfr::make_univector<kfr::complex<float>>(fftSize / 2 + 1);
+        windowedFrame = kfr::make_univector<float>(fftSize);
+        inverseFrame = kfr::make_univector<float>(fftSize);
+        
+        // Plan scratch: passed to every execute, whose temp-less overload
+        // allocates it per call
+        fftTemp = kfr::make_univector<kfr::u8>(fft->temp_size);
         
         // Allocate convolution buffer if needed
         if (convolutionEnabled) {
             convBuffer = kfr::make_univector<float>(blockSize * 2);
         }
+        
+        lockHotBuffers();
+    }
+    
+    // Keep the buffers the audio thread touches every block resident, so
+    // a page fault never lands in the callback
+    void lockHotBuffers() {
+        lockInMemory(inputBuffer);
+        lockInMemory(window);
+        lockInMemory(spectrum);
+        lockInMemory(windowedFrame);
+        lockInMemory(inverseFrame);
+        lockInMemory(fftTemp);
+    }
+    
+    // Unlocks exactly the ranges that were locked: inputBuffer is resized to
+    // every host block, so its current size may no longer match
+    void unlockHotBuffers() {
+        for (const auto& range : lockedRanges) {
+           #if JUCE_LINUX || JUCE_MAC
+            munlock(range.data, range.bytes);
+           #elif JUCE_WINDOWS
+            VirtualUnlock(const_cast<void*>(range.data), range.bytes);
+           #endif
+        }
+        lockedRanges.clear();
     }
     
-    kfr::univector<float> convertToKFRBuffer(const juce::AudioBuffer<float>& buffer) {
+    // Best effort: if the memlock limit is reached the buffer simply stays
+    // pageable. univector storage is already cache-line (64-byte) aligned.
+    template <typename T>
+    void lockInMemory(const kfr::univector<T>& data) {
+        jassert(reinterpret_cast<std::uintptr_t>(data.data()) % 64 == 0);
+        if (data.empty()) return;
+        
+        const LockedRange range { data.data(), data.size() * sizeof(T) };
+       #if JUCE_LINUX || JUCE_MAC
+        if (mlock(range.data, range.bytes) == 0) {
+            lockedRanges.push_back(range);
+        }
+       #elif JUCE_WINDOWS
+        if (VirtualLock(const_cast<void*>(range.data), range.bytes)) {
+            lockedRanges.push_back(range);
+        }
+       #endif
+    }
+    
+    // Fills the preallocated inputBuffer: shrinking it to a short host block
+    // keeps its capacity, so the callback does not allocate
+    kfr::univector<float>& convertToKFRBuffer(const juce::AudioBuffer<float>& buffer) {
         // Convert mono or mix down to mono for processing
-        kfr::univector<float> kfrBuffer(buffer.getNumSamples());
+        auto& kfrBuffer = inputBuffer;
+        kfrBuffer.resize(buffer.getNumSamples());
         
         if (buffer.getNumChannels() == 1) {
             // Mono: direct copy
@@ -2421,24 +3302,20 @@ private:
         for (size_t block = 0; block < numBlocks; ++block) {
             size_t offset = block * fftSize;
             
-            // Extract block and apply window
-            auto blockData = kfr::slice(buffer, offset, fftSize);
-            blockData = blockData * window;
+            // Window the block on its way into the FFT input
+            copyAndWindow(buffer.data() + offset, windowedFrame.data(), window.data(), fftSize);
             
             // Perform FFT
-            fft->execute(spectrum, blockData);
+            fft->execute(spectrum, windowedFrame, fftTemp);
             
             // Apply spectral processing
             spectralProcessor->process(spectrum);
             
             // Perform inverse FFT
-            fft->execute(blockData, spectrum, true);
-            
-            // Apply window again and overlap-add
-            blockData = blockData * window;
+            fft->execute(inverseFrame, spectrum, fftTemp);
             
-            // Store back (overlap-add would happen here)
-            kfr::copy(kfr::slice(buffer, offset, fftSize), blockData);
+            // Apply window again while storing back (overlap-add would happen here)
+            copyAndWindow(inverseFrame.data(), buffer.data() + offset, window.data(), fftSize);
         }
     }
     
@@ -2469,13 +3346,13 @@ private:
             
             // Perform FFT (still uses optimized library, but without SIMD hints)
             auto blockSlice = kfr::slice(buffer, offset, fftSize);
-            fft->execute(spectrum, blockSlice);
+            fft->execute(spectrum, blockSlice, fftTemp);
             
             // Process spectrum
             spectralProcessor->process(spectrum);
             
             // Inverse FFT
-            fft->execute(blockSlice, spectrum, true);
+            fft->execute(blockSlice, spectrum, fftTemp);
             
             // Apply window again
             for (size_t i = 0; i < fftSize; ++i) {
@@ -2492,66 +3369,133 @@ private:
         
         for (size_t block = 0; block < numBlocks; ++block) {
             size_t offset = block * fftSize;
-            auto blockSlice = kfr::slice(buffer, offset, fftSize);
             
-            // Apply window
-            blockSlice = blockSlice * window;
+            // Apply window on the way into the FFT input
+            copyAndWindow(buffer.data() + offset, windowedFrame.data(), window.data(), fftSize);
             
             // FFT
-            fft->execute(spectrum, blockSlice);
+            fft->execute(spectrum, windowedFrame, fftTemp);
             
             // Spectral processing
             spectralProcessor->process(spectrum);
             
             // Inverse FFT
-            fft->execute(blockSlice, spectrum, true);
+            fft->execute(inverseFrame, spectrum, fftTemp);
             
-            // Apply window again
-            blockSlice = blockSlice * window;
+            // Apply window again on the way back into the block
+            copyAndWindow(inverseFrame.data(), buffer.data() + offset, window.data(), fftSize);
         }
     }
     
+    // dst = src * win in one streaming pass (reads src and the window, writes
+    // dst) instead of a copy plus a separate in-place multiply
+    static void copyAndWindow(const float* src, float* dst, const float* win, size_t n) {
+        kfr::make_univector(dst, n) = kfr::make_univector(src, n) * kfr::make_univector(win, n);
+    }
+    
+    // out = log(max(|in|^2, 1e-10)) for n bins. KFR evaluates the expression
+    // lazily, so squaring and log happen in one pass: the bins are read once
+    // and no intermediate power array is written. No sqrt is needed either.
+    static void magLog(const kfr::complex<float>* in, float* out, size_t n) {
+        const auto bins = kfr::make_univector(in, n);
+        kfr::make_univector(out, n) = kfr::log(kfr::max(kfr::sqr(kfr::real(bins)) + kfr::sqr(kfr::imag(bins)), 1e-10f));
+    }
+    
+    // Stage numSamples into an FFT frame and zero the rest: a single memcpy
+    // and memset, which the C library runs as wide block moves
+    static void stageFrame(float* frame, size_t frameSize, const float* src, size_t numSamples) {
+        std::memcpy(frame, src, numSamples * sizeof(float));
+        std::memset(frame + numSamples, 0, (frameSize - numSamples) * sizeof(float));
+    }
+    
     void applyConvolution(kfr::univector<float>& buffer) {
-        if (!convolutionEngine) return;
+        if (!convolutionEngine || irIsIdentity) return;
+        
+        if (irIsSilent) {
+            buffer = 0.0f;
+            return;
+        }
         
         // Apply convolution using KFR's optimized engine
         convolutionEngine->apply(buffer, buffer);
     }
     
     void performRealtimeAnalysis(const kfr::univector<float>& buffer) {
-        if (!analyzer && !spectrogram && !waveformAnalyzer && !mfccAnalyzer) return;
-        
-        // Copy to analysis buffer
-        analysisBuffer.copyFrom(0, 0, buffer.data(), 
-                               static_cast<int>(std::min(buffer.size(), 
-                                                        (size_t)analysisBuffer.getNumSamples())));
-        
-        // Perform selected analysis
-        if (analyzer) {
-            analyzer->process(analysisBuffer);
-            spectrumBuffer = analyzer->getSpectrum();
-        } else if (spectrogram) {
-            spectrogram->addFrame(analysisBuffer);
-        } else if (waveformAnalyzer) {
-            waveformAnalyzer->process(analysisBuffer);
-        } else if (mfccAnalyzer) {
-            auto mfcc = mfccAnalyzer->process(analysisBuffer);
-            // Store or process MFCC coefficients
-        }
+        // Only one analyzer is ever active: visit dispatches on the variant
+        // index in one jump, with the analyzer held inline in the processor
+        std::visit([this, &buffer](auto& active) {
+            using Analyzer = std::decay_t<decltype(active)>;
+            
+            if constexpr (std::is_same_v<Analyzer, SpectrumAnalyzer>) {
+                // The spectrum analyzer reads the block where it is
+                active.process(buffer.data(), buffer.size());
+                spectrumBuffer.makeCopyOf(active.getSpectrum(), true);
+            } else if constexpr (!std::is_same_v<Analyzer, std::monostate>) {
+                // The other analyzers take a juce::AudioBuffer
+                analysisBuffer.copyFrom(0, 0, buffer.data(), 
+                                       static_cast<int>(std::min(buffer.size(), 
+                                                                (size_t)analysisBuffer.getNumSamples())));
+                
+                if constexpr (std::is_same_v<Analyzer, Spectrogram>) {
+                    active.addFrame(analysisBuffer);
+                } else if constexpr (std::is_same_v<Analyzer, WaveformAnalyzer>) {
+                    active.process(analysisBuffer);
+                } else {
+                    const auto& mfcc = active.process(analysisBuffer);
+                    // Store or process MFCC coefficients
+                }
+            }
+        }, activeAnalyzer);
     }
     
     void updateFFTSize(int sizeIndex) {
         int newSize = 256 * (1 << sizeIndex);
         if (newSize != fftSize) {
             fftSize = newSize;
-            fft = std::make_unique<kfr::dft_plan_real<float>>(fftSize);
+            fft = getOrCreatePlan(fftSize);
             updateFFTWindow();
             allocateProcessingBuffers(currentSamplesPerBlock);
+            
+            // The EQ gain table is per bin - rebuild it for the new bin count
+            updateSpectralProcessor();
+        }
+    }
+    
+    // Plan construction precomputes all twiddles, so plans are shared by size
+    // across processor instances and the analyzer instead of rebuilt each time
+    // the FFT size changes. The oldest size is dropped beyond maxCachedPlans;
+    // users holding it keep it alive through their shared_ptr.
+    static std::shared_ptr<kfr::dft_plan_real<float>> getOrCreatePlan(size_t size) {
+        static constexpr size_t maxCachedPlans = 8;
+        static std::mutex cacheLock;
+        static std::unordered_map<size_t, std::shared_ptr<kfr::dft_plan_real<float>>> planCache;
+        static std::deque<size_t> insertionOrder;
+        
+        const std::lock_guard<std::mutex> lock(cacheLock);
+        
+        if (auto it = planCache.find(size); it != planCache.end()) {
+            return it->second;
         }
+        
+        if (planCache.size() >= maxCachedPlans) {
+            planCache.erase(insertionOrder.front());
+            insertionOrder.pop_front();
+        }
+        
+        auto plan = std::make_shared<kfr::dft_plan_real<float>>(size);
+        planCache.emplace(size, plan);
+        insertionOrder.push_back(size);
+        return plan;
     }
     
     void updateSIMDSettings() {
-        if (simdEnabled) {
+        // Route the block to the kernel matching the setting and the CPU once
+        // here, rather than testing simdEnabled on every block
+        const bool useSIMD = simdEnabled && (simdCapabilities.sse2 || simdCapabilities.neon);
+        blockKernel = useSIMD ? &KFRProcessor::processWithSIMDOptimizations
+                              : &KFRProcessor::processWithoutSIMD;
+        
+        if (useSIMD) {
             // Configure for maximum SIMD performance
             kfr::cpu_t simdType = simdCapabilities;
             
@@ -2589,48 +3533,124 @@ private:
     void initializePerformanceMonitor() {
         performanceMonitorEnabled = true;
         processCount = 0;
-        totalProcessTime = 0.0;
-        maxProcessTime = 0.0;
-        minProcessTime = std::numeric_limits<double>::max();
+        totalProcessCycles = 0;
+        maxProcessCycles = 0;
+        minProcessCycles = std::numeric_limits<uint64_t>::max();
+    }
+    
+    // A time-stamp counter read is a single instruction, unlike a hi-res
+    // clock query; blocks are timed in cycles and converted to ms only when
+    // the stats are logged
+    static uint64_t readCycleCounter() noexcept {
+       #if JUCE_INTEL
+        return __rdtsc();
+       #else
+        return static_cast<uint64_t>(std::chrono::steady_clock::now().time_since_epoch().count());
+       #endif
+    }
+    
+    // Counter ticks per second, measured once against steady_clock over 100 ms
+    static double getCycleCounterRate() {
+        static const double rate = [] {
+           #if JUCE_INTEL
+            const auto clockStart = std::chrono::steady_clock::now();
+            const uint64_t cyclesStart = readCycleCounter();
+            std::this_thread::sleep_for(std::chrono::milliseconds(100));
+            const uint64_t cyclesEnd = readCycleCounter();
+            const std::chrono::duration<double> elapsed = std::chrono::steady_clock::now() - clockStart;
+            return static_cast<double>(cyclesEnd - cyclesStart) / elapsed.count();
+           #else
+            return static_cast<double>(std::chrono::steady_clock::period::den)
+                 / static_cast<double>(std::chrono::steady_clock::period::num);
+           #endif
+        }();
+        return rate;
     }
     
     void updatePerformanceStats() {
-        double processTime = processEndTime - processStartTime;
+        const uint64_t processCycles = processEndTime - processStartTime;
+        lastProcessCycles.store(processCycles, std::memory_order_relaxed);
         
-        totalProcessTime += processTime;
-        maxProcessTime = std::max(maxProcessTime, processTime);
-        minProcessTime = std::min(minProcessTime, processTime);
+        totalProcessCycles += processCycles;
+        maxProcessCycles = std::max(maxProcessCycles, processCycles);
+        minProcessCycles = std::min(minProcessCycles, processCycles);
         processCount++;
         
-        // Log stats every 1000 blocks
-        if (processCount % 1000 == 0) {
-            double avgTime = totalProcessTime / processCount;
+        // Log stats every 1000 blocks. Formatting and writing the log can
+        // allocate and block, so the audio thread only queues the raw counts
+        // for performanceLogger, which polls the queue - nothing is signalled
+        // from here. If the queue is full the snapshot is dropped.
+        // Each report covers its own window, so the counters start over.
+        if (processCount == 1000) {
+            const PerfStat stat { totalProcessCycles, minProcessCycles, maxProcessCycles, processCount };
+            perfStatFifo.write(1).forEach([this, &stat](int index) {
+                perfStats[static_cast<size_t>(index)] = stat;
+            });
+            
+            processCount = 0;
+            totalProcessCycles = 0;
+            maxProcessCycles = 0;
+            minProcessCycles = std::numeric_limits<uint64_t>::max();
+        }
+    }
+    
+    // performanceLogger thread only, after it has calibrated cyclesPerMs
+    void logPendingPerformanceStats() {
+        const double cyclesPerMs = this->cyclesPerMs.load(std::memory_order_relaxed);
+        perfStatFifo.read(perfStatFifo.getNumReady()).forEach([cyclesPerMs, this](int index) {
+            const auto& stat = perfStats[static_cast<size_t>(index)];
+            double avgTime = stat.totalCycles / cyclesPerMs / stat.count;
             juce::Logger::writeToLog(juce::String::formatted(
                 "KFR Performance: Avg=%.2fms, Min=%.2fms, Max=%.2fms",
-                avgTime, minProcessTime, maxProcessTime
+                avgTime, stat.minCycles / cyclesPerMs, stat.maxCycles / cyclesPerMs
             ));
-        }
+        });
     }
     
     // KFR Objects
-    std::unique_ptr<kfr::dft_plan_real<float>> fft;
+    std::shared_ptr<kfr::dft_plan_real<float>> fft;
     std::unique_ptr<kfr::convolve_filter<float>> convolutionEngine;
     kfr::univector<float> window;
     kfr::cpu_t simdCapabilities;
     
+    using BlockKernel = void (KFRProcessor::*)(kfr::univector<float>&);
+    BlockKernel blockKernel = &KFRProcessor::processWithoutSIMD;
+    
     // Processing buffers
     kfr::univector<float> inputBuffer;
     kfr::univector<float> outputBuffer;
     kfr::univector<float> tempBuffer;
     kfr::univector<float> convBuffer;
     kfr::univector<kfr::complex<float>> spectrum;
+    kfr::univector<float> windowedFrame;  // fftSize, windowed FFT input
+    kfr::univector<float> inverseFrame;   // fftSize, inverse FFT output
+    kfr::univector<kfr::u8> fftTemp;      // fft->temp_size
+    
+    // Memory locked by lockHotBuffers, as it was when locked
+    struct LockedRange {
+        const void* data = nullptr;
+        size_t bytes = 0;
+    };
+    std::vector<LockedRange> lockedRanges;
     
     // Analysis objects
+    // Rectangular EQ band: gain applies to bins in [lowHz, highHz)
+    struct EQBand {
+        float lowHz = 0.0f;
+        float highHz = 0.0f;
+        float gain = 1.0f;  // linear
+    };
+    
     class SpectralProcessor {
     public:
         enum class Type { EQ, NoiseReduction, PitchShift, FormantShift, SpectralFreeze };
         
-        void setType(Type t) { type = t; }
+        // The kernel is picked here, when the user changes the type, so
+        // process() is one indirect call instead of a switch per frame
+        void setType(Type t) {
+            type = t;
+            processFn = selectProcessFn(t);
+        }
         
         void prepare(double sampleRate, size_t fftSize) {
             this->sampleRate = sampleRate;
@@ -2656,44 +3676,69 @@ private:
             }
         }
         
+        void setEQBand(size_t index, const EQBand& band) {
+            eqBands[index] = band;
+            refreshEQGainTable();
+        }
+        
         void process(kfr::univector<kfr::complex<float>>& spectrum) {
-            switch(type) {
+            (this->*processFn)(spectrum);
+        }
+        
+    private:
+        using ProcessFn = void (SpectralProcessor::*)(kfr::univector<kfr::complex<float>>&);
+        
+        static ProcessFn selectProcessFn(Type t) {
+            switch(t) {
                 case Type::EQ:
-                    processEQ(spectrum);
-                    break;
+                    return &SpectralProcessor::processEQ;
                 case Type::NoiseReduction:
-                    processNoiseReduction(spectrum);
-                    break;
+                    return &SpectralProcessor::processNoiseReduction;
                 // ... other processing methods
+                default:
+                    return &SpectralProcessor::processNone;
             }
         }
         
-    private:
+        // Types without a kernel leave the spectrum untouched
+        void processNone(kfr::univector<kfr::complex<float>>&) {}
+        
         void initEQ() {
             // Initialize EQ bands
             eqBands.resize(10);
             // ... EQ setup
+            refreshEQGainTable();
         }
         
-        void processEQ(kfr::univector<kfr::complex<float>>& spectrum) {
-            // Apply EQ to spectrum
-            for (size_t i = 0; i < spectrum.size(); ++i) {
-                float freq = i * sampleRate / (2.0f * fftSize);
-                float gain = calculateEQGain(freq);
-                spectrum[i] *= gain;
+        // The EQ curve only changes with the bands, the sample rate or the FFT
+        // size - evaluate it per bin here, not for every block.
+        // Band lookup is branchless: each band is one select over all bins at
+        // once (bin frequency in [lowHz, highHz) ? gain : previous), so there
+        // is no per-bin "which band am I in" search. Later bands win where
+        // ranges overlap; empty bands (lowHz == highHz) match nothing.
+        void refreshEQGainTable() {
+            eqGainTable.resize(fftSize / 2 + 1);
+            eqGainTable = 1.0f;
+            
+            const auto binFrequency = kfr::counter(0.0f, static_cast<float>(sampleRate / fftSize));
+            for (const auto& band : eqBands) {
+                eqGainTable = kfr::select(binFrequency < band.highHz,
+                                          kfr::select(binFrequency >= band.lowHz, band.gain, eqGainTable),
+                                          eqGainTable);
             }
         }
         
-        float calculateEQGain(float frequency) {
-            // Calculate EQ gain for frequency
-            // Implementation depends on EQ design
-            return 1.0f;
+        void processEQ(kfr::univector<kfr::complex<float>>& spectrum) {
+            // Apply EQ to spectrum: one vectorised complex-by-real multiply
+            spectrum = spectrum * eqGainTable;
         }
         
         Type type = Type::EQ;
+        ProcessFn processFn = &SpectralProcessor::processEQ;
         double sampleRate = 44100.0;
         size_t fftSize = 1024;
         std::vector<EQBand> eqBands;
+        kfr::univector<float> eqGainTable;  // per bin, fftSize / 2 + 1
     };
     
     std::unique_ptr<SpectralProcessor> spectralProcessor;
@@ -2703,49 +3748,278 @@ private:
     public:
         SpectrumAnalyzer(size_t fftSize, double sampleRate) 
             : fftSize(fftSize), sampleRate(sampleRate) {
-            fft = std::make_unique<kfr::dft_plan_real<float>>(fftSize);
-            spectrum.resize(fftSize / 2 + 1);
+            fft = getOrCreatePlan(fftSize);
+            
+            // Work buffers live as long as the analyzer: nothing is allocated
+            // per block. One buffer holds both domains - the real FFT writes
+            // its fftSize / 2 + 1 bins (CCs format) over the samples it reads,
+            // so the working set is one array instead of two.
+            workBuffer.resize(fftSize + 2);
+            fftTemp.resize(fft->temp_size);
+            magnitudes.setSize(1, static_cast<int>(numBins()));
         }
         
-        void process(const juce::AudioBuffer<float>& buffer) {
-            // Process audio to spectrum
-            kfr::univector<float> timeData(fftSize);
-            std::copy(buffer.getReadPointer(0), 
-                     buffer.getReadPointer(0) + std::min(fftSize, (size_t)buffer.getNumSamples()),
-                     timeData.begin());
+        void process(const float* data, size_t size) {
+            // Process audio to spectrum, zero-padding a short block
+            const size_t numSamples = std::min(fftSize, size);
+            stageFrame(workBuffer.data(), workBuffer.size(), data, numSamples);
             
-            fft->execute(spectrum, timeData);
+            fft->execute(spectrumData(), workBuffer.data(), fftTemp.data());
         }
         
-        juce::AudioBuffer<float> getSpectrum() {
-            // Convert to magnitude spectrum
-            juce::AudioBuffer<float> result(1, static_cast<int>(spectrum.size()));
-            for (size_t i = 0; i < spectrum.size(); ++i) {
-                result.setSample(0, static_cast<int>(i), std::abs(spectrum[i]));
-            }
-            return result;
+        // Magnitude spectrum of the last processed block, valid until the next call
+        const juce::AudioBuffer<float>& getSpectrum() {
+            // |re + i*im| for all bins in one KFR expression, evaluated with
+            // the SIMD width KFR was built for
+            kfr::make_univector(magnitudes.getWritePointer(0), numBins())
+                = kfr::cabs(kfr::make_univector(spectrumData(), numBins()));
+            return magnitudes;
         }
         
     private:
+        size_t numBins() const { return fftSize / 2 + 1; }
+        
+        kfr::complex<float>* spectrumData() {
+            return reinterpret_cast<kfr::complex<float>*>(workBuffer.data());
+        }
+        
         size_t fftSize;
         double sampleRate;
-        std::unique_ptr<kfr::dft_plan_real<float>> fft;
+        std::shared_ptr<kfr::dft_plan_real<float>> fft;
+        kfr::univector<float> workBuffer;  // fftSize samples in, fftSize / 2 + 1 bins out
+        kfr::univector<kfr::u8> fftTemp;
+        juce::AudioBuffer<float> magnitudes;
+    };
+    
+    // Mel-frequency cepstral coefficients. The triangular mel filterbank is
+    // built once as sparse rows - first bin plus the nonzero weights - so a
+    // frame costs one contiguous dot product per filter instead of a branchy
+    // ramp over every bin, and the DCT-II is a precomputed matrix.
+    class MFCCAnalyzer {
+    public:
+        static constexpr size_t numFilters = 26;
+        static constexpr size_t numCoefficients = 13;
+        
+        MFCCAnalyzer(double sampleRate, size_t fftSize) : fftSize(fftSize) {
+            fft = getOrCreatePlan(fftSize);
+            timeData.resize(fftSize);
+            spectrum.resize(fftSize / 2 + 1);
+            fftTemp.resize(fft->temp_size);
+            power.resize(spectrum.size());
+            logEnergies.resize(numFilters);
+            coefficients.resize(numCoefficients);
+            
+            buildFilterbank(sampleRate);
+            buildDCT();
+        }
+        
+        // Coefficients of the block, valid until the next call
+        const kfr::univector<float>& process(const juce::AudioBuffer<float>& buffer) {
+            const size_t numSamples = std::min(fftSize, (size_t)buffer.getNumSamples());
+            stageFrame(timeData.data(), timeData.size(), buffer.getReadPointer(0), numSamples);
+            
+            fft->execute(spectrum, timeData, fftTemp);
+            power = kfr::sqr(kfr::real(spectrum)) + kfr::sqr(kfr::imag(spectrum));
+            
+            for (size_t m = 0; m < numFilters; ++m) {
+                const auto& filter = filters[m];
+                logEnergies[m] = kfr::dotproduct(
+                    kfr::make_univector(power.data() + filter.start, filter.weights.size()), filter.weights);
+            }
+            logEnergies = kfr::log(kfr::max(logEnergies, 1e-10f));
+            
+            for (size_t k = 0; k < numCoefficients; ++k) {
+                coefficients[k] = kfr::dotproduct(
+                    kfr::make_univector(dct.data() + k * numFilters, numFilters), logEnergies);
+            }
+            return coefficients;
+        }
+        
+    private:
+        struct MelFilter {
+            size_t start = 0;
+            kfr::univector<float> weights;
+        };
+        
+        static float hzToMel(float hz) { return 2595.0f * std::log10(1.0f + hz / 700.0f); }
+        static float melToHz(float mel) { return 700.0f * (std::pow(10.0f, mel / 2595.0f) - 1.0f); }
+        
+        void buildFilterbank(double sampleRate) {
+            // numFilters + 2 band edges, evenly spaced in mel, as fractional bins
+            const float maxMel = hzToMel(static_cast<float>(sampleRate * 0.5));
+            const float binHz = static_cast<float>(sampleRate / fftSize);
+            std::vector<float> edges(numFilters + 2);
+            for (size_t i = 0; i < edges.size(); ++i) {
+                edges[i] = melToHz(maxMel * i / (numFilters + 1)) / binHz;
+            }
+            
+            filters.resize(numFilters);
+            for (size_t m = 0; m < numFilters; ++m) {
+                const float left = edges[m], centre = edges[m + 1], right = edges[m + 2];
+                const size_t first = static_cast<size_t>(std::ceil(left));
+                const size_t last = std::min(static_cast<size_t>(std::floor(right)), power.size() - 1);
+                
+                auto& filter = filters[m];
+                filter.start = first;
+                filter.weights.resize(last >= first ? last - first + 1 : 0);
+                for (size_t bin = first; bin <= last; ++bin) {
+                    const float b = static_cast<float>(bin);
+                    filter.weights[bin - first] = b <= centre ? (b - left) / (centre - left)
+                                                              : (right - b) / (right - centre);
+                }
+            }
+        }
+        
+        void buildDCT() {
+            dct.resize(numCoefficients * numFilters);
+            for (size_t k = 0; k < numCoefficients; ++k) {
+                for (size_t m = 0; m < numFilters; ++m) {
+                    dct[k * numFilters + m] = std::cos(juce::MathConstants<float>::pi * k * (m + 0.5f) / numFilters);
+                }
+            }
+        }
+        
+        size_t fftSize;
+        std::shared_ptr<kfr::dft_plan_real<float>> fft;
+        kfr::univector<float> timeData;
         kfr::univector<kfr::complex<float>> spectrum;
+        kfr::univector<kfr::u8> fftTemp;
+        kfr::univector<float> power;
+        std::vector<MelFilter> filters;
+        kfr::univector<float> dct;  // numCoefficients x numFilters, row-major
+        kfr::univector<float> logEnergies;
+        kfr::univector<float> coefficients;
     };
     
-    std::unique_ptr<SpectrumAnalyzer> analyzer;
-    std::unique_ptr<class Spectrogram> spectrogram;
-    std::unique_ptr<class WaveformAnalyzer> waveformAnalyzer;
-    std::unique_ptr<class MFCCAnalyzer> mfccAnalyzer;
+    class Spectrogram {
+    public:
+        // Frames arrive faster than a waterfall display needs them, so they
+        // are queued and transformed batchSize at a time: the plan's twiddles
+        // and the temp buffer stay hot in cache across the whole batch.
+        static constexpr size_t batchSize = 8;
+        
+        Spectrogram(size_t fftSize, size_t historyLength) : fftSize(fftSize) {
+            fft = getOrCreatePlan(fftSize);
+            
+            // Each slot holds fftSize samples in and fftSize / 2 + 1 bins out
+            // (in-place real FFT, CCs format)
+            pendingFrames.resize(batchSize * slotSize());
+            fftTemp.resize(fft->temp_size);
+            history.setSize(static_cast<int>(historyLength), static_cast<int>(numBins()));
+            history.clear();
+        }
+        
+        void addFrame(const juce::AudioBuffer<float>& buffer) {
+            float* slot = pendingFrames.data() + numPending * slotSize();
+            const size_t numSamples = std::min(fftSize, (size_t)buffer.getNumSamples());
+            stageFrame(slot, slotSize(), buffer.getReadPointer(0), numSamples);
+            
+            if (++numPending == batchSize) {
+                processBatch();
+            }
+        }
+        
+        // One log-power row per frame, written round-robin; the newest row is
+        // the one before getWritePosition()
+        const juce::AudioBuffer<float>& getHistory() const { return history; }
+        int getWritePosition() const { return writePosition; }
+        
+    private:
+        size_t numBins() const { return fftSize / 2 + 1; }
+        size_t slotSize() const { return fftSize + 2; }
+        
+        void processBatch() {
+            for (size_t frame = 0; frame < batchSize; ++frame) {
+                float* slot = pendingFrames.data() + frame * slotSize();
+                auto* bins = reinterpret_cast<kfr::complex<float>*>(slot);
+                fft->execute(bins, slot, fftTemp.data());
+                
+                magLog(bins, history.getWritePointer(writePosition), numBins());
+                writePosition = (writePosition + 1) % history.getNumChannels();
+            }
+            numPending = 0;
+        }
+        
+        size_t fftSize;
+        std::shared_ptr<kfr::dft_plan_real<float>> fft;
+        kfr::univector<float> pendingFrames;  // batchSize slots of fftSize + 2
+        kfr::univector<kfr::u8> fftTemp;
+        size_t numPending = 0;
+        juce::AudioBuffer<float> history;     // historyLength x (fftSize / 2 + 1)
+        int writePosition = 0;
+    };
+    
+    // Oscilloscope view: keeps the most recent block
+    class WaveformAnalyzer {
+    public:
+        explicit WaveformAnalyzer(int maxBlockSize) {
+            waveform.setSize(1, maxBlockSize);
+            waveform.clear();
+        }
+        
+        void process(const juce::AudioBuffer<float>& buffer) {
+            numSamples = std::min(buffer.getNumSamples(), waveform.getNumSamples());
+            waveform.copyFrom(0, 0, buffer, 0, 0, numSamples);
+        }
+        
+        const float* getWaveform() const { return waveform.getReadPointer(0); }
+        int getNumSamples() const { return numSamples; }
+        
+    private:
+        juce::AudioBuffer<float> waveform;
+        int numSamples = 0;
+    };
+    
+    using AnalyzerVariant = std::variant<std::monostate, SpectrumAnalyzer, Spectrogram, WaveformAnalyzer, MFCCAnalyzer>;
+    AnalyzerVariant activeAnalyzer;
     
     // Performance monitoring
     bool performanceMonitorEnabled = false;
-    double processStartTime = 0.0;
-    double processEndTime = 0.0;
+    uint64_t processStartTime = 0;  // cycle counter ticks
+    uint64_t processEndTime = 0;
     size_t processCount = 0;
-    double totalProcessTime = 0.0;
-    double maxProcessTime = 0.0;
-    double minProcessTime = 0.0;
+    uint64_t totalProcessCycles = 0;
+    uint64_t maxProcessCycles = 0;
+    uint64_t minProcessCycles = 0;
+    std::atomic<double> cyclesPerMs { 0.0 };  // set by performanceLogger
+    std::atomic<uint64_t> lastProcessCycles { 0 };
+    
+    struct PerfStat {
+        uint64_t totalCycles = 0;
+        uint64_t minCycles = 0;
+        uint64_t maxCycles = 0;
+        size_t count = 0;
+    };
+    
+    // Audio thread -> performanceLogger
+    static constexpr int perfStatQueueSize = 16;
+    juce::AbstractFifo perfStatFifo { perfStatQueueSize };
+    std::array<PerfStat, perfStatQueueSize> perfStats;
+    
+    class PerformanceLogger : public juce::Thread {
+    public:
+        explicit PerformanceLogger(KFRProcessor& p) : juce::Thread("KFR Performance Logger"), owner(p) {}
+        
+        void run() override {
+            // The first calibration in the process sleeps 100 ms - here it
+            // holds up neither the constructor nor a plugin scan
+            owner.cyclesPerMs.store(getCycleCounterRate() / 1000.0, std::memory_order_relaxed);
+            
+            // Snapshots arrive every 1000 blocks - a 100 ms poll keeps up
+            // without the audio thread having to notify (mutex + condvar)
+            while (!threadShouldExit()) {
+                wait(100);
+                if (owner.perfStatFifo.getNumReady() > 0) {
+                    owner.logPendingPerformanceStats();
+                }
+            }
+        }
+        
+    private:
+        KFRProcessor& owner;
+    };
+    
+    PerformanceLogger performanceLogger { *this };
     
     // Parameters and state
     juce::AudioProcessorValueTreeState parameters;
@@ -2757,6 +4031,9 @@ private:
     bool simdEnabled = true;
     bool spectralProcessingEnabled = false;
     bool convolutionEnabled = false;
+    kfr::univector<float> impulseResponse;
+    bool irIsSilent = false;    // set by loadImpulseResponse
+    bool irIsIdentity = false;
     bool realtimeAnalysisEnabled = false;
     
     // Analysis buffers
@@ -2768,67 +4045,265 @@ private:
     }
 ]
 
-# ==================== GENERATOR FUNKTIONEN ====================
+# ==================== PROMPTS + GEWICHTUNG ====================
+
+# (Prompt-Kopf, Prompt-Beschreibung, Beispiel-Pool, Gewicht)
+# Prompt pro Beispiel: "<Kopf> #<idx>: <Name> - <Beschreibung>"
+weights = [
+    ("JUCE 8 Core Implementation",
+     "Vollständige Cross-platform WebView Integration mit Platform-spezifischer Optimierung.",
+     JUCE8_CORE_EXAMPLES, 40),
+    ("DSPFilters Integration",
+     "Komplette Filter-Bibliothek Integration in JUCE AudioProcessor mit allen Filter-Typen und Modulation.",
+     DSPFILTERS_EXAMPLES, 30),
+    ("KFR Framework Integration",
+     "SIMD-optimierte DSP Verarbeitung mit FFT, Convolution und Echtzeit-Analyse in JUCE.",
+     KFR_EXAMPLES, 30),
+]
+
+@functools.lru_cache(maxsize=1024)
+def _json_fragment(text: str) -> bytes:
+    """JSON-escapter Stringinhalt ohne die umschließenden Anführungszeichen
+    (gecacht - z.B. der Prompt-Kopf ist für alle Einträge eines Katalogs gleich)."""
+    return orjson.dumps(text)[1:-1]
 
-def generate_juce_core_example(idx):
-    example = random.choice(JUCE8_CORE_EXAMPLES)
-    prompt = f"JUCE 8 Core Implementation #{idx}: {example['name']} - Vollständige Cross-platform WebView Integration mit Platform-spezifischer Optimierung."
-    return {"prompt": prompt, "completion": example["code"]}
+# Code-Block und Prompt (bis auf #idx) sind pro Katalog-Eintrag konstant und
+# wiederholen sich in tausenden Beispielen - einmalig serialisieren und beim
+# Bauen nur noch einsetzen, statt sie pro Beispiel neu zu formatieren/escapen.
+for head, description, examples, _ in weights:
+    for example in examples:
+        example["code_json"] = orjson.dumps(example["code"])
+        example["prompt_head_json"] = _json_fragment(head)
+        example["prompt_tail_json"] = _json_fragment(f"{example['name']} - {description}")
 
-def generate_dspfilters_example(idx):
-    example = random.choice(DSPFILTERS_EXAMPLES)
-    prompt = f"DSPFilters Integration #{idx}: {example['name']} - Komplette Filter-Bibliothek Integration in JUCE AudioProcessor mit allen Filter-Typen und Modulation."
-    return {"prompt": prompt, "completion": example["code"]}
+# Das Schema ist fest - Datensätze werden direkt aus serialisierten Feldern
+# zusammengesetzt statt über ein dict + generischen JSON-Encoder (inkl.
+# Zeilenende, damit die Writer ganze Batches ohne Nachbearbeitung schreiben).
+RECORD_TEMPLATE = b'{"prompt":"%b #%d: %b","completion":%b}\n'
 
-def generate_kfr_example(idx):
-    example = random.choice(KFR_EXAMPLES)
-    prompt = f"KFR Framework Integration #{idx}: {example['name']} - SIMD-optimierte DSP Verarbeitung mit FFT, Convolution und Echtzeit-Analyse in JUCE."
-    return {"prompt": prompt, "completion": example["code"]}
+# ==================== JSONL WRITER ====================
 
-# ==================== GEWICHTUNG ====================
+_HAS_FADVISE = hasattr(os, "posix_fadvise")  # fehlt unter Windows/macOS
 
-weights = [
-    (generate_juce_core_example, 40),
-    (generate_dspfilters_example, 30),
-    (generate_kfr_example, 30),
-]
+class MappedFileWriter:
+    """Kopiert Bytes direkt in ein per mmap eingeblendetes WRITE_BUFFER_SIZE-
+    Fenster der Ausgabedatei (eine Kopie in den Page Cache, kein Zwischenpuffer
+    und kein write() pro Block). Ist das Fenster voll, wird die Datei per
+    ftruncate verlängert und das nächste Fenster eingeblendet; close() kürzt die
+    Datei auf die tatsächlich geschriebene Länge.
+    Wo posix_fadvise verfügbar ist (Linux), wird die Datei als sequentiell
+    markiert und jedes volle Fenster nach dem Zurückschreiben per DONTNEED aus
+    dem Page Cache entlassen - die Ausgabe wird hier nie wieder gelesen und
+    soll keine nützlicheren Seiten verdrängen."""
+
+    def __init__(self, path):
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+        if _HAS_FADVISE:
+            os.posix_fadvise(self.fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        self.window = None
+        self.window_start = 0  # Dateioffset des aktuellen Fensters
+        self.pos = 0           # Schreibposition im Fenster
+
+    def write(self, data):
+        view = memoryview(data)
+        size = len(view)
+        while view:
+            if self.window is None or self.pos == WRITE_BUFFER_SIZE:
+                self._next_window()
+            n = min(len(view), WRITE_BUFFER_SIZE - self.pos)
+            self.window[self.pos:self.pos + n] = view[:n]
+            self.pos += n
+            view = view[n:]
+        return size
+
+    def _next_window(self):
+        # Unter Windows lässt sich eine eingeblendete Datei nicht verlängern -
+        # altes Fenster daher vor dem ftruncate schließen.
+        if self.window is not None:
+            self._release_window(WRITE_BUFFER_SIZE)
+            self.window_start += WRITE_BUFFER_SIZE
+        os.ftruncate(self.fd, self.window_start + WRITE_BUFFER_SIZE)
+        self.window = mmap.mmap(self.fd, WRITE_BUFFER_SIZE, access=mmap.ACCESS_WRITE, offset=self.window_start)
+        self.pos = 0
+
+    def _release_window(self, length):
+        # DONTNEED verwirft nur saubere Seiten - das Fenster daher vorher
+        # zurückschreiben (msync gibt den GIL frei, blockiert nur diesen Writer).
+        if _HAS_FADVISE:
+            self.window.flush()
+        self.window.close()
+        self.window = None
+        if _HAS_FADVISE:
+            os.posix_fadvise(self.fd, self.window_start, length, os.POSIX_FADV_DONTNEED)
+
+    def close(self):
+        if self.window is not None:
+            self._release_window(self.pos)
+        os.ftruncate(self.fd, self.window_start + self.pos)
+        os.close(self.fd)
+
+class JsonlWriter:
+    """Schreibt Batches serialisierter JSONL-Zeilen (inkl. Zeilenende) in eine
+    Datei, bei ZSTD_LEVEL > 0 durch einen zstd-Stream (Datei bekommt dann .zst)."""
+
+    def __init__(self, path):
+        if ZSTD_LEVEL > 0:
+            import zstandard
+
+            self.file = MappedFileWriter(path + ".zst")
+            # threads=-1: libzstd komprimiert intern auf allen Kernen
+            compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=-1)
+            self.stream = compressor.stream_writer(self.file, closefd=False)
+        else:
+            self.file = self.stream = MappedFileWriter(path)
+        self.count = 0
+
+    def writelines(self, lines):
+        # Ein join in C + ein write pro Batch statt eines Python-Aufrufs pro Zeile
+        # (zstandards stream_writer kennt kein writelines()).
+        self.stream.write(b"".join(lines))
+        self.count += len(lines)
+
+    def close(self):
+        if self.stream is not self.file:
+            self.stream.close()  # schreibt das Frame-Ende
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
 # ==================== DATASET GENERATION ====================
 
-print("🚀 Erstelle VOLLSTÄNDIGES Dataset mit 1800+ Zeilen Beispielen...")
+def plan_split(categories):
+    """Stratifizierter Split: innerhalb jeder Kategorie (Generator) wird mit
+    festem Seed permutiert und exakt VAL_RATIO nach Val geschnitten. Kategorien
+    mit weniger als ceil(1 / VAL_RATIO) Beispielen gehen komplett nach Train.
+    Liefert eine bool-Maske (True = Beispiel gehört nach Val)."""
+    is_val = np.zeros(len(categories), dtype=bool)
+    if VAL_RATIO <= 0:
+        return is_val
+    rng = np.random.default_rng(SPLIT_SEED)
+    min_group = math.ceil(1 / VAL_RATIO)
+    for cat in range(len(weights)):
+        group = np.flatnonzero(categories == cat)
+        if len(group) < min_group:
+            continue
+        cut = int(len(group) * (1 - VAL_RATIO))
+        is_val[rng.permutation(group)[cut:]] = True
+    return is_val
+
+def build_example(task: tuple[int, int, int]) -> bytes:
+    """Baut das Beispiel (idx, Kategorie, Variante) und liefert es fertig
+    serialisiert (ohne eigenen Zufall)."""
+    idx, cat, variant = task
+    example = weights[cat][2][variant]
+    return RECORD_TEMPLATE % (example["prompt_head_json"], idx, example["prompt_tail_json"], example["code_json"])
+
+def train_paths() -> list[str]:
+    """Pfade der Train-Shards (eine train.jsonl bei TRAIN_SHARDS == 1)."""
+    if TRAIN_SHARDS == 1:
+        return [os.path.join(output_dir, "train.jsonl")]
+    return [os.path.join(output_dir, f"train-{i:03d}.jsonl") for i in range(TRAIN_SHARDS)]
+
+def _write_loop(write_queue, out, errors):
+    """Schreib-Thread einer Ausgabedatei: schreibt Zeilen-Batches bis zum
+    None-Sentinel. Nach einem Fehler wird die Queue weiter geleert, damit der
+    Produzent nicht an der vollen Queue hängen bleibt; main() wirft den Fehler
+    danach erneut."""
+    while True:
+        batch = write_queue.get()
+        if batch is None:
+            return
+        if errors:
+            continue
+        try:
+            out.writelines(batch)
+        except BaseException as e:
+            errors.append(e)
+
+def main():
+    print("🚀 Erstelle VOLLSTÄNDIGES Dataset mit 1800+ Zeilen Beispielen...")
 
-dataset = []
-for idx in range(TOTAL_EXAMPLES):
-    r = random.randint(1, 100)
-    cumulative = 0
-    for gen, w in weights:
-        cumulative += w
-        if r <= cumulative:
-            dataset.append(gen(idx))
-            break
+    # Kategorie und Beispiel-Variante werden vorab im Hauptprozess gezogen -
+    # vektorisiert in NumPy statt einem Python-RNG-Aufruf pro Beispiel: der
+    # Split kann pro Kategorie stratifiziert werden, und build_example selbst
+    # braucht keinen Zufall.
+    rng = np.random.default_rng(DATASET_SEED)
+    probs = np.array([w for _, _, _, w in weights], dtype=float)
+    categories = rng.choice(len(weights), size=TOTAL_EXAMPLES, p=probs / probs.sum())
+    pool_sizes = np.array([len(examples) for _, _, examples, _ in weights])
+    variants = rng.integers(0, pool_sizes[categories])
+    tasks = list(zip(range(TOTAL_EXAMPLES), categories.tolist(), variants.tolist()))
+    # Ziel-Datei pro Beispiel vorab vektorisiert: Index in outs/queues, Train-
+    # Beispiele reihum (idx % TRAIN_SHARDS) auf die Shards, Val = TRAIN_SHARDS.
+    # Ohne Val-Anteil (VAL_RATIO == 0) wird val.jsonl gar nicht erst angelegt.
+    has_val = VAL_RATIO > 0
+    targets = np.where(plan_split(categories), TRAIN_SHARDS, np.arange(TOTAL_EXAMPLES) % TRAIN_SHARDS).tolist()
 
-random.shuffle(dataset)
-split_idx = int(TOTAL_EXAMPLES * (1 - VAL_RATIO))
-train_set = dataset[:split_idx]
-val_set = dataset[split_idx:]
+    # Einmaliges Setup: Ordner anlegen (nicht auf Modulebene, erst beim
+    # Ausführen des Skripts) und Ausgaben eines
+    # früheren Laufs mit anderer Shard-Anzahl/Kompression entfernen, damit die
+    # train*.jsonl*/val.jsonl*-Muster in modelTraining.py nur diesen Lauf sehen.
+    os.makedirs(output_dir, exist_ok=True)
+    shard_paths = train_paths()
+    suffix = ".zst" if ZSTD_LEVEL > 0 else ""
+    out_paths = shard_paths + ([val_file] if has_val else [])
+    current = {path + suffix for path in out_paths}
+    for name in os.listdir(output_dir):
+        path = os.path.join(output_dir, name)
+        if name.startswith(("train", "val")) and ".jsonl" in name and path not in current:
+            os.remove(path)
 
-def write_jsonl(filename, data):
-    with open(filename, "w", encoding="utf-8") as f:
-        for item in data:
-            json.dump(item, f, ensure_ascii=False)
-            f.write("\n")
+    # Die Beispiele werden direkt im Hauptprozess gebaut: build_example ist
+    # ein einziges bytes-%-Format (läuft in C) - ein Prozess-Pool würde jedes
+    # ~46-KB-Record picklen und durch eine Pipe schicken und wäre damit
+    # langsamer als das Bauen selbst. Jede Ausgabedatei (Train-Shards + Val)
+    # hat ihren eigenen Schreib-Thread mit eigener Queue, so laufen mehrere
+    # Writes parallel und überlappen mit dem Generieren; die Beispiele werden
+    # pro Datei zu Batches von WRITE_BATCH_SIZE gesammelt.
+    errors = []
+    with contextlib.ExitStack() as stack:
+        outs = [stack.enter_context(JsonlWriter(path)) for path in out_paths]
+        queues = [queue.Queue(maxsize=WRITE_QUEUE_SIZE) for _ in outs]
+        writers = [threading.Thread(target=_write_loop, args=(q, out, errors)) for q, out in zip(queues, outs)]
+        for writer in writers:
+            writer.start()
+        batches = [[] for _ in outs]
+        try:
+            lines = map(build_example, tasks)
+            for target, line in zip(targets, lines):
+                batch = batches[target]
+                batch.append(line)
+                if len(batch) >= WRITE_BATCH_SIZE:
+                    queues[target].put(batch[:])
+                    batch.clear()
+            for q, batch in zip(queues, batches):
+                if batch:
+                    q.put(batch)
+        finally:
+            for q in queues:
+                q.put(None)
+            for writer in writers:
+                writer.join()
+        if errors:
+            raise errors[0]
+    train_count = sum(out.count for out in outs[:TRAIN_SHARDS])
+    val_count = outs[TRAIN_SHARDS].count if has_val else 0
 
-write_jsonl(train_file, train_set)
-write_jsonl(val_file, val_set)
+    print(f"✅ VOLLSTÄNDIGES Dataset erstellt!")
+    print(f"📊 {TOTAL_EXAMPLES} Beispiele mit 1800+ Zeilen Code pro Beispiel")
+    print(f"📁 Train: {train_count} ({len(shard_paths)} Datei(en)), Val: {val_count}")
+    print(f"📂 Ausgabe: {output_dir}")
+    print(f"\n📚 Enthaltene Kategorien:")
+    print(f"   1. JUCE 8 Cross-platform WebView (1000+ Zeilen)")
+    print(f"   2. DSPFilters Integration (800+ Zeilen)")
+    print(f"   3. KFR Framework SIMD DSP (1000+ Zeilen)")
+    print(f"   4. Platform-spezifische Optimierungen")
+    print(f"   5. Vollständige Parameter-Handling")
+    print(f"   6. Echtzeit Audio Processing")
 
-print(f"✅ VOLLSTÄNDIGES Dataset erstellt!")
-print(f"📊 {TOTAL_EXAMPLES} Beispiele mit 1800+ Zeilen Code pro Beispiel")
-print(f"📁 Train: {len(train_set)}, Val: {len(val_set)}")
-print(f"📂 Ausgabe: {output_dir}")
-print(f"\n📚 Enthaltene Kategorien:")
-print(f"   1. JUCE 8 Cross-platform WebView (1000+ Zeilen)")
-print(f"   2. DSPFilters Integration (800+ Zeilen)")
-print(f"   3. KFR Framework SIMD DSP (1000+ Zeilen)")
-print(f"   4. Platform-spezifische Optimierungen")
-print(f"   5. Vollständige Parameter-Handling")
-print(f"   6. Echtzeit Audio Processing")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@
 
 import torch
 import gc
+import glob
 import psutil
 import time
 from datasets import load_dataset
@@ -33,8 +34,10 @@ torch.set_float32_matmul_precision("medium")
 # Paths
 # ------------------------------------------------------------
 MODEL_PATH = "/mnt/d/AI-Models/training/Qwen2.5-Coder-7b/Original/Qwen2.5-Coder-7B"
-TRAIN_FILE = "/mnt/c/Users/marku/Documents/Github/artqcid/ai-projects/qwen2.5-7b-training/python/dataset_juce8_complete_full/train.jsonl"
-VAL_FILE   = "/mnt/c/Users/marku/Documents/Github/artqcid/ai-projects/qwen2.5-7b-training/python/dataset_juce8_complete_full/val.jsonl"
+# createDataSet.py may shard the train split (train-000.jsonl, ...) and
+# zstd-compress its output (*.jsonl.zst, needs zstandard installed)
+TRAIN_FILE = "/mnt/c/Users/marku/Documents/Github/artqcid/ai-projects/qwen2.5-7b-training/python/dataset_juce8_complete_full/train*.jsonl*"
+VAL_FILE   = "/mnt/c/Users/marku/Documents/Github/artqcid/ai-projects/qwen2.5-7b-training/python/dataset_juce8_complete_full/val.jsonl*"
 
 OUTPUT_DIR = "/mnt/d/AI-Models/training/Qwen2.5-Coder-7b/Trained"
 
@@ -52,9 +55,14 @@ gc.collect()
 # Dataset
 # ------------------------------------------------------------
 print("📥 Loading dataset...")
+# With VAL_RATIO = 0 createDataSet.py writes no val.jsonl - train without eval then
+HAS_VAL = bool(glob.glob(VAL_FILE))
+data_files = {"train": TRAIN_FILE}
+if HAS_VAL:
+    data_files["validation"] = VAL_FILE
 dataset = load_dataset(
     "json",
-    data_files={"train": TRAIN_FILE, "validation": VAL_FILE}
+    data_files=data_files
 )
 
 # ------------------------------------------------------------
@@ -221,7 +229,7 @@ training_args = TrainingArguments(
     save_steps=500,
     save_total_limit=2,
 
-    eval_strategy="steps",
+    eval_strategy="steps" if HAS_VAL else "no",
     eval_steps=500,
 
     remove_unused_columns=True,
@@ -240,7 +248,7 @@ trainer = Trainer(
     model=model,
     args=training_args,
     train_dataset=dataset["train"],
-    eval_dataset=dataset["validation"],
+    eval_dataset=dataset["validation"] if HAS_VAL else None,
     data_collator=data_collator,
     callbacks=[
         MemoryMonitorCallback(),